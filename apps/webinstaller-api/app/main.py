@@ -5,13 +5,23 @@ import os
 import signal
 import time
 import re
+import random
 import secrets
 import string
 import ssl
 import shutil
 import asyncio
 import threading
+import tempfile
+import bisect
+import gzip
+import hashlib
+import tarfile
+import select
 import urllib3
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 
 # Disable SSL warnings for self-signed certificates
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -19,14 +29,15 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 from fastapi import FastAPI, Depends, Request, File, UploadFile, APIRouter, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, StreamingResponse, JSONResponse
+from starlette.background import BackgroundTask
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
 import paramiko
 import httpx
 
-from ldap3 import Server, Connection, ALL, Tls
-from ldap3.core.exceptions import LDAPSocketOpenError, LDAPBindError
+from ldap3 import Server, Connection, ANONYMOUS, DSA, SIMPLE, Tls
+from ldap3.core.exceptions import LDAPSocketOpenError, LDAPBindError, LDAPException
 
 from cryptography import x509
 from cryptography.x509.oid import NameOID
@@ -41,6 +52,23 @@ STATIC_PATH = BASE_PATH / "static"
 
 EDULUTION_DIRECTORY = os.environ.get("EDULUTION_DIRECTORY", "/srv/docker/edulution-ui")
 
+LMN_PROXY_MAX_CONNECTIONS = int(os.environ.get("LMN_PROXY_MAX_CONNECTIONS", "20"))
+LMN_PROXY_MAX_KEEPALIVE = int(os.environ.get("LMN_PROXY_MAX_KEEPALIVE", "10"))
+LMN_PROXY_KEEPALIVE_EXPIRY = float(os.environ.get("LMN_PROXY_KEEPALIVE_EXPIRY", "60"))
+LMN_PROXY_CONNECT_TIMEOUT = float(os.environ.get("LMN_PROXY_CONNECT_TIMEOUT", "5"))
+LMN_PROXY_RETRY_AFTER = float(os.environ.get("LMN_PROXY_RETRY_AFTER", "5"))
+LDAP_INFO_TTL = float(os.environ.get("LDAP_INFO_TTL", "300"))
+LDAP_IDLE_TTL = float(os.environ.get("LDAP_IDLE_TTL", "60"))
+BOOTSTRAP_LOG_MAX_MEMORY = int(os.environ.get("BOOTSTRAP_LOG_MAX_MEMORY", str(1024 * 1024)))
+BOOTSTRAP_MAX_PARALLEL = int(os.environ.get("BOOTSTRAP_MAX_PARALLEL", "8"))
+SSH_SESSION_TTL = float(os.environ.get("SSH_SESSION_TTL", "600"))
+# Defaults to the repository checkout, the Docker image sets it to its own copy
+LMN_INSTALLER_DIR = Path(os.environ.get("LMN_INSTALLER_DIR", BASE_PATH.parent.parent.parent / "edulution-lmninstaller"))
+LMN_WHEELHOUSE_DIR = Path(os.environ.get("LMN_WHEELHOUSE_DIR", BASE_PATH / "wheelhouse"))
+LMN_BUNDLE_DIR = Path(os.environ.get("LMN_BUNDLE_DIR", Path(tempfile.gettempdir()) / "lmn-bundle"))
+# Base URL under which targets reach this installer, derived from the SSH session if unset
+INSTALLER_PUBLIC_URL = os.environ.get("INSTALLER_PUBLIC_URL", "").rstrip("/")
+
 
 # --- Pydantic Models ---
 
@@ -89,61 +117,265 @@ class LmnConnectionCheck(BaseModel):
 
 # --- Bootstrap Manager (SSE with reconnect support) ---
 
+SSE_KEEPALIVE_INTERVAL = 15.0
+SSE_READ_CHUNK = 256 * 1024
+
+
+class BootstrapEventLog:
+    # Append-only log of ready-to-send SSE frames. Byte positions are logical:
+    # [0, _memory_start) lives in a spill file, the rest in _memory.
+    # _offsets maps event id -> position, so resuming by id is a lookup.
+    def __init__(self, max_memory: int):
+        self._max_memory = max_memory
+        self._offsets = array('q')
+        self._memory = bytearray()
+        self._memory_start = 0
+        self._spill = None
+
+    def __len__(self):
+        return len(self._offsets)
+
+    @property
+    def size(self) -> int:
+        return self._memory_start + len(self._memory)
+
+    def append(self, frame: bytes):
+        self.extend([frame])
+
+    def extend(self, frames: list[bytes]):
+        position = self.size
+        for frame in frames:
+            self._offsets.append(position)
+            position += len(frame)
+        self._memory += b"".join(frames)
+        if len(self._memory) > self._max_memory:
+            # Ältere Hälfte auslagern, logische Positionen bleiben gültig
+            cut = len(self._memory) // 2
+            if self._spill is None:
+                self._spill = tempfile.TemporaryFile(prefix="bootstrap-events-")
+            self._spill.seek(0, os.SEEK_END)
+            self._spill.write(self._memory[:cut])
+            self._spill.flush()
+            del self._memory[:cut]
+            self._memory_start += cut
+
+    def snapshot(self, start_id: int, max_bytes: int) -> tuple[tuple[int, int], bytes, int]:
+        # Returns (spilled byte range, in-memory bytes, next event id), caller holds the lock
+        start = self._offsets[start_id]
+        end_id = bisect.bisect_right(self._offsets, start + max_bytes, lo=start_id + 1) - 1
+        end_id = max(end_id, start_id + 1)
+        end = self._offsets[end_id] if end_id < len(self._offsets) else self.size
+
+        file_end = min(end, self._memory_start)
+        memory_part = bytes(self._memory[max(start, file_end) - self._memory_start:end - self._memory_start])
+        return (start, file_end), memory_part, end_id
+
+    def read_spilled(self, start: int, end: int) -> bytes:
+        if end <= start:
+            return b""
+        return os.pread(self._spill.fileno(), end - start, start)
+
+
 class BootstrapManager:
+    # Events are written by the bootstrap thread and read by async SSE
+    # subscribers. The thread only takes a short lock and schedules one
+    # wakeup on the event loop, subscribers never block a threadpool thread.
     def __init__(self):
-        self._events: list[dict] = []
-        self._status = 'idle'  # idle, running, completed, failed
-        self._condition = threading.Condition()
+        self._log = BootstrapEventLog(BOOTSTRAP_LOG_MAX_MEMORY)
+        self._status = 'idle'  # idle, queued, running, completed, failed
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._changed: asyncio.Event | None = None
+        self._wakeup_scheduled = False
 
     @property
     def status(self):
         return self._status
 
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        if self._loop is not loop:
+            self._loop = loop
+            self._changed = asyncio.Event()
+
+    def _wake_subscribers(self):
+        with self._lock:
+            self._wakeup_scheduled = False
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def _notify(self):
+        # Caller holds self._lock
+        if self._loop is None or self._wakeup_scheduled:
+            return
+        self._wakeup_scheduled = True
+        self._loop.call_soon_threadsafe(self._wake_subscribers)
+
+    def queue(self):
+        with self._lock:
+            self._status = 'queued'
+            self._notify()
+
     def reset(self):
-        with self._condition:
-            self._events = []
+        with self._lock:
+            self._log = BootstrapEventLog(BOOTSTRAP_LOG_MAX_MEMORY)
             self._status = 'running'
-            self._condition.notify_all()
+            self._notify()
 
     def add_event(self, data: str, event_type: str = 'message'):
-        with self._condition:
-            self._events.append({
-                'id': len(self._events),
-                'event': event_type,
-                'data': data,
-            })
-            self._condition.notify_all()
+        self.add_events([data], event_type)
+
+    def add_events(self, lines: list[str], event_type: str = 'message'):
+        # One lock round trip and at most one wakeup for a whole batch
+        if not lines:
+            return
+        event_line = f"event: {event_type}\n" if event_type != 'message' else ""
+        with self._lock:
+            first_id = len(self._log)
+            self._log.extend([
+                (f"id: {first_id + i}\n{event_line}data: " + data.replace("\n", "\ndata: ") + "\n\n").encode("utf-8")
+                for i, data in enumerate(lines)
+            ])
+            self._notify()
 
     def finish(self, status: str):
-        with self._condition:
+        with self._lock:
             self._status = status
-            self._condition.notify_all()
+            self._notify()
 
-    def stream_from(self, start_id: int):
+    async def stream_from(self, start_id: int):
+        self.bind_loop(asyncio.get_running_loop())
         yield "retry: 3000\n\n"
         cursor = start_id
         while True:
-            with self._condition:
-                while cursor >= len(self._events) and self._status == 'running':
-                    self._condition.wait(timeout=5.0)
-                new_events = self._events[cursor:]
-                cursor = len(self._events)
-                is_done = self._status != 'running'
-
-            for evt in new_events:
-                lines = f"id: {evt['id']}\n"
-                if evt['event'] != 'message':
-                    lines += f"event: {evt['event']}\n"
-                lines += f"data: {evt['data']}\n\n"
-                yield lines
+            changed = self._changed
+            snapshot = None
+            with self._lock:
+                log = self._log
+                if cursor < len(log):
+                    snapshot = log.snapshot(cursor, SSE_READ_CHUNK)
+                is_done = self._status in ('completed', 'failed')
+
+            if snapshot is not None:
+                (spill_start, spill_end), memory_part, cursor = snapshot
+                if spill_end > spill_start:
+                    yield await asyncio.to_thread(log.read_spilled, spill_start, spill_end) + memory_part
+                else:
+                    yield memory_part
+                continue
 
             if is_done:
                 break
 
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=SSE_KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+
 
 bootstrap_manager = BootstrapManager()
 
 
+# --- LMN Upstream Client (pooled keep-alive connection to the LMN-Installer API) ---
+
+# Read timeouts per proxied route (first matching prefix wins), default 60s
+LMN_PROXY_ROUTE_TIMEOUTS: list[tuple[str, float]] = [
+    ("health", 5.0),
+    ("status", 10.0),
+    ("network-info", 15.0),
+    ("edulution-config", 10.0),
+    ("playbook/", 60.0),
+]
+LMN_PROXY_DEFAULT_TIMEOUT = 60.0
+
+# Hop-by-hop headers must not be forwarded, otherwise e.g. "Connection: close"
+# from the browser would tear down the pooled upstream connection
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+    "host",
+}
+
+
+# Remembers an unreachable target, so only one request per retry window
+# pays the connect timeout instead of every UI poll
+class UpstreamHealth:
+    def __init__(self, retry_after: float):
+        self._retry_after = retry_after
+        self._lock = threading.Lock()
+        self._host: str | None = None
+        self._down_until = 0.0
+        self._failures = 0
+
+    def is_down(self, host: str) -> bool:
+        with self._lock:
+            if host != self._host:
+                return False
+            return time.monotonic() < self._down_until
+
+    def mark_down(self, host: str):
+        with self._lock:
+            if host != self._host:
+                self._host = host
+                self._failures = 0
+            self._failures += 1
+            self._down_until = time.monotonic() + self._retry_after
+
+    def mark_up(self, host: str):
+        with self._lock:
+            self._host = host
+            self._failures = 0
+            self._down_until = 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "host": self._host,
+                "down": time.monotonic() < self._down_until,
+                "failures": self._failures,
+            }
+
+
+class LmnUpstream:
+    def __init__(self):
+        self._client: httpx.AsyncClient | None = None
+        self.health = UpstreamHealth(LMN_PROXY_RETRY_AFTER)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=LMN_PROXY_MAX_CONNECTIONS,
+                    max_keepalive_connections=LMN_PROXY_MAX_KEEPALIVE,
+                    keepalive_expiry=LMN_PROXY_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(LMN_PROXY_DEFAULT_TIMEOUT, connect=LMN_PROXY_CONNECT_TIMEOUT),
+            )
+        return self._client
+
+    def timeout_for(self, path: str) -> httpx.Timeout:
+        read_timeout = LMN_PROXY_DEFAULT_TIMEOUT
+        for prefix, route_timeout in LMN_PROXY_ROUTE_TIMEOUTS:
+            if path.startswith(prefix):
+                read_timeout = route_timeout
+                break
+        return httpx.Timeout(read_timeout, connect=LMN_PROXY_CONNECT_TIMEOUT)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+lmn_upstream = LmnUpstream()
+
+
 # --- Data Store ---
 
 class Data:
@@ -174,7 +406,16 @@ def getData():
 
 # --- FastAPI App ---
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(build_target_archives)
+    yield
+    await lmn_upstream.aclose()
+    bootstrap_orchestrator.shutdown()
+    ssh_sessions.close_all()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -249,32 +490,158 @@ def checkWebDAV(data: Data = Depends(getData)):
         return {"status": False, "message": "Unbekannter Fehler!"}
 
 
-def _create_ldap_server(data: Data) -> Server:
-    if data.DATA_LMN_LDAP_SCHEMA == "ldaps":
-        return Server(
-            data.DATA_LMN_EXTERNAL_DOMAIN,
-            port=int(data.DATA_LMN_LDAP_PORT),
-            get_info=ALL,
-            connect_timeout=3,
-            use_ssl=True,
-            tls=Tls(validate=ssl.CERT_NONE),
-        )
-    return Server(
-        data.DATA_LMN_EXTERNAL_DOMAIN,
-        port=int(data.DATA_LMN_LDAP_PORT),
-        get_info=ALL,
-        connect_timeout=3,
-    )
+# --- LDAP (cached server info, pooled connections) ---
+
+class _TimedTls(Tls):
+    # Measures the TLS handshake separately from the TCP connect
+    def wrap_socket(self, connection, do_handshake=False):
+        started = time.perf_counter()
+        try:
+            return super().wrap_socket(connection, do_handshake)
+        finally:
+            connection.tls_seconds = time.perf_counter() - started
+
+
+class LdapCache:
+    # Server objects (and the root DSE read on first bind) are kept per
+    # host/port/schema for LDAP_INFO_TTL, open connections are returned to a
+    # small idle pool per bind identity, so a connection is only reused by
+    # the same (anonymous or bind) user.
+    MAX_IDLE = 2
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._servers: dict[tuple, tuple[Server, float]] = {}
+        self._info_read: set[tuple] = set()
+        self._idle: dict[tuple, list[tuple[Connection, float]]] = {}
+
+    def _pop_idle(self, key: tuple) -> list[tuple[Connection, float]]:
+        # Caller holds self._lock; idle connections of all bind identities for `key`
+        idle = []
+        for idle_key in [k for k in self._idle if k[:3] == key]:
+            idle.extend(self._idle.pop(idle_key))
+        return idle
+
+    def _server(self, key: tuple) -> Server:
+        host, port, schema = key
+        now = time.monotonic()
+        with self._lock:
+            cached = self._servers.get(key)
+            if cached and now - cached[1] < LDAP_INFO_TTL:
+                return cached[0]
+            idle = self._pop_idle(key)
+            if schema == "ldaps":
+                server = Server(
+                    host,
+                    port=port,
+                    get_info=DSA,
+                    connect_timeout=3,
+                    use_ssl=True,
+                    tls=_TimedTls(validate=ssl.CERT_NONE),
+                )
+            else:
+                server = Server(host, port=port, get_info=DSA, connect_timeout=3)
+            self._servers[key] = (server, now)
+            self._info_read.discard(key)
+        for conn, _ in idle:
+            conn.unbind()
+        return server
+
+    def invalidate(self, key: tuple):
+        with self._lock:
+            self._servers.pop(key, None)
+            self._info_read.discard(key)
+            idle = self._pop_idle(key)
+        for conn, _ in idle:
+            conn.unbind()
+
+    def _acquire(self, key: tuple, user: str | None) -> Connection | None:
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get((*key, user), [])
+            while idle:
+                conn, released_at = idle.pop()
+                if now - released_at < LDAP_IDLE_TTL and not conn.closed:
+                    return conn
+                conn.unbind()
+        return None
+
+    def _release(self, key: tuple, conn: Connection):
+        with self._lock:
+            idle = self._idle.setdefault((*key, conn.user), [])
+            if len(idle) < self.MAX_IDLE:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.unbind()
+
+    def bind(self, data: Data, user: str | None = None, password: str | None = None) -> tuple[Connection, dict]:
+        key = (data.DATA_LMN_EXTERNAL_DOMAIN, int(data.DATA_LMN_LDAP_PORT), data.DATA_LMN_LDAP_SCHEMA)
+        server = self._server(key)
+        read_info = key not in self._info_read
+        timings = {
+            "connect_ms": 0.0,
+            "tls_ms": None,
+            "bind_ms": 0.0,
+            "reused": False,
+            "server_info_cached": not read_info,
+        }
+
+        conn = self._acquire(key, user)
+        if conn is not None:
+            timings["reused"] = True
+        else:
+            conn = Connection(server, read_only=True)
+            conn.tls_seconds = None
+            started = time.perf_counter()
+            try:
+                conn.open(read_server_info=False)
+            except LDAPException:
+                # ldap3 markiert die Adresse als nicht verfügbar, nächster Versuch mit frischem Server
+                self.invalidate(key)
+                raise
+            elapsed = time.perf_counter() - started
+            if conn.tls_seconds is not None:
+                timings["tls_ms"] = round(conn.tls_seconds * 1000, 1)
+                elapsed -= conn.tls_seconds
+            timings["connect_ms"] = round(elapsed * 1000, 1)
+
+        conn.user = user
+        conn.password = password
+        conn.authentication = SIMPLE if user else ANONYMOUS
+        started = time.perf_counter()
+        try:
+            conn.bind(read_server_info=read_info)
+        except LDAPException:
+            if not timings["reused"]:
+                raise
+            # Idle-Verbindung wurde serverseitig geschlossen, neu aufbauen
+            conn.unbind()
+            return self.bind(data, user, password)
+        timings["bind_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        if read_info and conn.bound:
+            with self._lock:
+                self._info_read.add(key)
+        return conn, timings
+
+    def release(self, data: Data, conn: Connection):
+        key = (data.DATA_LMN_EXTERNAL_DOMAIN, int(data.DATA_LMN_LDAP_PORT), data.DATA_LMN_LDAP_SCHEMA)
+        if conn.closed:
+            return
+        self._release(key, conn)
+
+
+ldap_cache = LdapCache()
 
 
 @api.get("/check-ldap-status")
 def checkLDAPStatus(data: Data = Depends(getData)):
     try:
-        server = _create_ldap_server(data)
-        conn = Connection(server, auto_bind=True)
-        if conn.bind():
-            return {"status": True, "message": "Successful"}
-        return {"status": False, "message": "Keine Verbindung zum LDAP-Server!"}
+        conn, timings = ldap_cache.bind(data)
+        bound = conn.bound
+        ldap_cache.release(data, conn)
+        if bound:
+            return {"status": True, "message": "Successful", "timings": timings}
+        return {"status": False, "message": "Keine Verbindung zum LDAP-Server!", "timings": timings}
     except LDAPSocketOpenError as e:
         print(e)
         return {"status": False, "message": "Unbekannter Fehler!"}
@@ -286,16 +653,19 @@ def checkLDAPStatus(data: Data = Depends(getData)):
 @api.get("/check-ldap-access-status")
 def checkLDAPAccessStatus(data: Data = Depends(getData)):
     try:
-        server = _create_ldap_server(data)
-        conn = Connection(
-            server,
+        conn, timings = ldap_cache.bind(
+            data,
             user=data.DATA_LMN_BINDUSER_DN,
             password=data.DATA_LMN_BINDUSER_PW,
-            auto_bind=True,
         )
-        if conn.bind():
-            return {"status": True, "message": "Successful"}
-        return {"status": False, "message": "Keine Verbindung zum LDAP-Server!"}
+        bound = conn.bound
+        description = (conn.result or {}).get("description") or ""
+        ldap_cache.release(data, conn)
+        if bound:
+            return {"status": True, "message": "Successful", "timings": timings}
+        if "invalidCredentials" in description:
+            return {"status": False, "message": "LDAP Zugangsdaten falsch!", "timings": timings}
+        return {"status": False, "message": "Keine Verbindung zum LDAP-Server!", "timings": timings}
     except LDAPSocketOpenError as e:
         print(e)
         return {"status": False, "message": "Unbekannter Fehler!"}
@@ -309,6 +679,102 @@ def checkLDAPAccessStatus(data: Data = Depends(getData)):
         return {"status": False, "message": "Unbekannter Fehler!"}
 
 
+# --- Preflight (all LMN connectivity checks concurrently) ---
+
+PREFLIGHT_TCP_TIMEOUT = 3.0
+
+
+async def _preflight_tcp(host: str, port: int) -> dict:
+    try:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), timeout=PREFLIGHT_TCP_TIMEOUT
+        )
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+        return {"status": True, "message": f"Port {port} erreichbar"}
+    except asyncio.TimeoutError:
+        return {"status": False, "message": f"Port {port}: Timeout!"}
+    except OSError as e:
+        return {"status": False, "message": f"Port {port} nicht erreichbar: {e.strerror or e}"}
+
+
+async def _timed_check(name: str, required: bool, check) -> dict:
+    started = time.perf_counter()
+    try:
+        result = await check
+    except Exception as e:
+        print(e)
+        result = {"status": False, "message": "Unbekannter Fehler!"}
+    return {
+        "name": name,
+        "required": required,
+        "status": result["status"],
+        "message": result["message"],
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        **({"timings": result["timings"]} if "timings" in result else {}),
+    }
+
+
+def _preflight_checks(data: Data) -> list:
+    host = data.DATA_LMN_EXTERNAL_DOMAIN
+    ldap_ports = {389, 636}
+    if data.DATA_LMN_LDAP_PORT:
+        ldap_ports.add(int(data.DATA_LMN_LDAP_PORT))
+    checks = [
+        _timed_check("api", True, asyncio.to_thread(checkAPIStatus, data)),
+        _timed_check("webdav", True, asyncio.to_thread(checkWebDAV, data)),
+        _timed_check("ldap", True, asyncio.to_thread(checkLDAPStatus, data)),
+        _timed_check("ldap_access", True, asyncio.to_thread(checkLDAPAccessStatus, data)),
+        _timed_check("tcp_443", False, _preflight_tcp(host, 443)),
+        _timed_check("tcp_8001", False, _preflight_tcp(host, 8001)),
+    ]
+    for port in sorted(ldap_ports):
+        checks.append(_timed_check(f"tcp_{port}", False, _preflight_tcp(host, port)))
+    checks.append(
+        _timed_check("tcp_8000", False, _preflight_tcp(data.DATA_LMN_TARGET_HOST or host, 8000))
+    )
+    return checks
+
+
+@api.get("/preflight")
+async def preflight(stream: bool = False, data: Data = Depends(getData)):
+    if not data.DATA_LMN_EXTERNAL_DOMAIN:
+        return {"status": False, "message": "Konfiguration unvollständig", "checks": []}
+
+    started = time.perf_counter()
+    checks = _preflight_checks(data)
+
+    def summary(results: list[dict]) -> dict:
+        passed = all(r["status"] for r in results if r["required"])
+        return {
+            "status": passed,
+            "message": "Successful" if passed else "Prüfungen fehlgeschlagen",
+            "checks": results,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    if not stream:
+        return summary(list(await asyncio.gather(*checks)))
+
+    # NDJSON: eine Zeile pro abgeschlossener Prüfung, zuletzt die Zusammenfassung
+    async def stream_results():
+        results = []
+        for next_result in asyncio.as_completed(checks):
+            result = await next_result
+            results.append(result)
+            yield json.dumps({"check": result}) + "\n"
+        yield json.dumps({"summary": summary(results)}) + "\n"
+
+    return StreamingResponse(
+        stream_results(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @api.post("/set-admin-group")
 def setAdminGroup(req: AdminGroupRequest, data: Data = Depends(getData)):
     data.DATA_INITIAL_ADMIN_GROUP = req.admin_group
@@ -462,21 +928,268 @@ BOOTSTRAP_BRANCH = os.environ.get("BOOTSTRAP_BRANCH", "main")
 BOOTSTRAP_URL = f"https://raw.githubusercontent.com/edulution-io/edulution-installer/{BOOTSTRAP_BRANCH}/edulution-lmninstaller/bootstrap.sh"
 
 
-@api.post("/lmn/bootstrap")
-async def lmn_bootstrap(ssh: SSHConnection, data: Data = Depends(getData)):
-    if bootstrap_manager.status == 'running':
+def file_sha256(path: Path) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class TargetArchive:
+    # Tarball of a directory that bootstrap pulls onto the target, built at
+    # startup. Entries are sorted, mtime, owner and the gzip timestamp are
+    # zeroed and modes only keep the executable bit, so an unchanged tree
+    # always yields the same archive. The file name carries a key (the
+    # archive's own sha256 unless given), the content behind a name never
+    # changes.
+    def __init__(self, name: str, route: str, source: Path, target_dir: Path, compress: bool = True):
+        self._name = name
+        self._route = route
+        self._source = source
+        self._target_dir = target_dir
+        # Wheels are zip files already, gzip would only cost CPU
+        self._compress = compress
+        self._suffix = ".tar.gz" if compress else ".tar"
+        self._lock = threading.Lock()
+        self._path: Path | None = None
+        self._sha256: str | None = None
+        self._key: str | None = None
+
+    def _files(self):
+        for dirpath, dirnames, filenames in os.walk(self._source):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith(".") and d != "__pycache__")
+            for name in sorted(filenames):
+                if name.startswith(".") or name.endswith(".pyc"):
+                    continue
+                yield Path(dirpath) / name
+
+    @staticmethod
+    def _normalize(info: tarfile.TarInfo) -> tarfile.TarInfo:
+        info.mtime = 0
+        info.uid = info.gid = 0
+        info.uname = info.gname = ""
+        info.mode = 0o755 if info.mode & 0o100 else 0o644
+        return info
+
+    def build(self, key: str | None = None) -> bool:
+        tmp_name = None
+        try:
+            self._target_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self._target_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as raw:
+                out = gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) if self._compress else raw
+                with out, tarfile.open(fileobj=out, mode="w") as tar:
+                    for path in self._files():
+                        tar.add(
+                            str(path),
+                            arcname=path.relative_to(self._source).as_posix(),
+                            recursive=False,
+                            filter=self._normalize,
+                        )
+
+            digest = file_sha256(Path(tmp_name))
+            key = key or digest
+            path = self._target_dir / f"{self._name}-{key[:16]}{self._suffix}"
+            os.replace(tmp_name, path)
+            for old in self._target_dir.glob(f"{self._name}-*{self._suffix}"):
+                if old != path:
+                    old.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"{self._name} konnte nicht gepackt werden: {e}")
+            if tmp_name is not None:
+                Path(tmp_name).unlink(missing_ok=True)
+            return False
+
+        with self._lock:
+            self._path = path
+            self._sha256 = digest
+            self._key = key
+        return True
+
+    def current(self) -> tuple[Path, str, str] | None:
+        # (archive path, archive sha256, key)
+        with self._lock:
+            if self._path is None or not self._path.exists():
+                return None
+            return self._path, self._sha256, self._key
+
+    def info(self) -> dict | None:
+        current = self.current()
+        if current is None:
+            return None
+        path, digest, key = current
+        return {
+            "version": key[:16],
+            "key": key,
+            "sha256": digest,
+            "size": path.stat().st_size,
+            "url": f"/api/{self._route}/{path.name}",
+        }
+
+    def response(self, name: str):
+        current = self.current()
+        if current is None or current[0].name != name:
+            return JSONResponse(
+                status_code=404,
+                content={"status": False, "message": f"{self._name} nicht gefunden"},
+            )
+        path, digest, _ = current
+        return FileResponse(
+            str(path),
+            media_type="application/gzip" if self._compress else "application/x-tar",
+            headers={"Cache-Control": "public, max-age=31536000, immutable", "ETag": f'"{digest}"'},
+        )
+
+
+lmn_bundle = TargetArchive("edulution-lmninstaller", "bundle", LMN_INSTALLER_DIR, LMN_BUNDLE_DIR)
+lmn_wheelhouse = TargetArchive("wheelhouse", "wheelhouse", LMN_WHEELHOUSE_DIR, LMN_BUNDLE_DIR, compress=False)
+
+
+def build_target_archives():
+    if not (LMN_INSTALLER_DIR / "bootstrap.sh").is_file():
+        print(f"LMN-Installer nicht gefunden unter {LMN_INSTALLER_DIR}, Bootstrap lädt von GitHub")
+        return
+    lmn_bundle.build()
+
+    # The wheelhouse is keyed by the requirements it was downloaded for and
+    # only offered while they match the bundled requirements.txt
+    requirements = LMN_INSTALLER_DIR / "requirements.txt"
+    built_for = LMN_WHEELHOUSE_DIR / "requirements.txt"
+    if not built_for.is_file():
+        print(f"Kein Wheelhouse unter {LMN_WHEELHOUSE_DIR}, Bootstrap installiert von PyPI")
+        return
+    key = file_sha256(requirements)
+    if file_sha256(built_for) != key:
+        print("Wheelhouse passt nicht zur requirements.txt, Bootstrap installiert von PyPI")
+        return
+    lmn_wheelhouse.build(key)
+
+
+@api.get("/bundle")
+def bundle_info():
+    info = lmn_bundle.info()
+    if info is None:
         return JSONResponse(
-            status_code=409,
-            content={"status": False, "message": "Bootstrap läuft bereits"},
+            status_code=404,
+            content={"status": False, "message": "Kein LMN-Installer Bundle verfügbar"},
         )
+    return {**info, "wheelhouse": lmn_wheelhouse.info()}
 
-    bootstrap_manager.reset()
 
-    def run_bootstrap():
+@api.get("/bundle/bootstrap.sh")
+def bundle_bootstrap_script():
+    script = LMN_INSTALLER_DIR / "bootstrap.sh"
+    if not script.is_file():
+        return JSONResponse(
+            status_code=404,
+            content={"status": False, "message": "bootstrap.sh nicht gefunden"},
+        )
+    return FileResponse(str(script), media_type="text/x-shellscript")
+
+
+@api.get("/bundle/{name}")
+def bundle_download(name: str):
+    return lmn_bundle.response(name)
+
+
+@api.get("/wheelhouse/{name}")
+def wheelhouse_download(name: str):
+    return lmn_wheelhouse.response(name)
+
+
+def installer_url_for(client: paramiko.SSHClient, scheme: str, port: int | None) -> str | None:
+    # The address the target sees for this SSH session is the one it can
+    # reach the installer on, even behind NAT or Docker port publishing
+    if INSTALLER_PUBLIC_URL:
+        return INSTALLER_PUBLIC_URL
+    _, stdout, _ = client.exec_command("echo ${SSH_CONNECTION%% *}", timeout=10)
+    address = stdout.read().decode("utf-8", "replace").strip()
+    if not address:
+        return None
+    if ":" in address:
+        address = f"[{address}]"
+    return f"{scheme}://{address}" + (f":{port}" if port else "")
+
+
+def bootstrap_script(
+    installer_url: str | None = None, payload_dir: str | None = None, with_wheelhouse: bool = True
+) -> str:
+    # Payload pushed via SFTP to `payload_dir`, else downloaded by the target
+    # from `installer_url`, else from GitHub. `with_wheelhouse` is False when
+    # the wheelhouse was not pushed because the target's venv is up to date.
+    bundle = lmn_bundle.current()
+    if bundle is None or (installer_url is None and payload_dir is None):
+        return (
+            f"export GITHUB_BRANCH={BOOTSTRAP_BRANCH} && tmpfile=$(mktemp) && "
+            f"curl -fsSL {BOOTSTRAP_URL} -o $tmpfile && bash $tmpfile; "
+            f"status=$?; rm -f $tmpfile; exit $status"
+        )
+
+    wheelhouse = lmn_wheelhouse.current() if with_wheelhouse else None
+    if payload_dir is not None:
+        bundle_url = f"file://{payload_dir}/{bundle[0].name}"
+        wheelhouse_url = f"file://{payload_dir}/{wheelhouse[0].name}" if wheelhouse else None
+        run = f"bash {payload_dir}/bootstrap.sh; status=$?; rm -rf {payload_dir}; exit $status"
+    else:
+        # Self-signed certificate, so -k. The script is checked against its
+        # sha256 before it runs as root, the script checks the downloads.
+        script_sha256 = file_sha256(LMN_INSTALLER_DIR / "bootstrap.sh")
+        bundle_url = f"{installer_url}/api/bundle/{bundle[0].name}"
+        wheelhouse_url = f"{installer_url}/api/wheelhouse/{wheelhouse[0].name}" if wheelhouse else None
+        run = (
+            f"tmpfile=$(mktemp) && curl -fsSLk {installer_url}/api/bundle/bootstrap.sh -o $tmpfile && "
+            f"echo \"{script_sha256}  $tmpfile\" | sha256sum -c --quiet && "
+            f"bash $tmpfile; status=$?; rm -f $tmpfile; exit $status"
+        )
+
+    env = f"BUNDLE_URL={bundle_url} BUNDLE_SHA256={bundle[1]}"
+    if wheelhouse is not None:
+        env += f" WHEELHOUSE_URL={wheelhouse_url} WHEELHOUSE_SHA256={wheelhouse[1]} WHEELHOUSE_KEY={wheelhouse[2]}"
+    return f"export GITHUB_BRANCH={BOOTSTRAP_BRANCH} {env} && {run}"
+
+
+class SSHSessions:
+    # One authenticated transport per target (host, port, user), kept for
+    # SSH_SESSION_TTL after its last use. exec and SFTP open new channels on
+    # it, so follow-up operations skip the TCP, key exchange and auth round trips.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: dict[tuple, tuple[paramiko.SSHClient, str, float]] = {}
+
+    @staticmethod
+    def _key(ssh: SSHConnection) -> tuple:
+        return ssh.host, ssh.port, ssh.user
+
+    def _expired(self, now: float) -> list[paramiko.SSHClient]:
+        # Caller holds self._lock
+        expired = []
+        for key, (client, _, last_used) in list(self._sessions.items()):
+            transport = client.get_transport()
+            if now - last_used >= SSH_SESSION_TTL or transport is None or not transport.is_active():
+                expired.append(client)
+                del self._sessions[key]
+        return expired
+
+    def get(self, ssh: SSHConnection) -> tuple[paramiko.SSHClient, bool]:
+        # Returns (client, reused)
+        key = self._key(ssh)
+        now = time.monotonic()
+        with self._lock:
+            expired = self._expired(now)
+            cached = self._sessions.get(key)
+            if cached and not secrets.compare_digest(cached[1].encode(), ssh.password.encode()):
+                cached = None
+            if cached:
+                self._sessions[key] = (cached[0], cached[1], now)
+        for client in expired:
+            client.close()
+        if cached:
+            return cached[0], True
+
         client = paramiko.SSHClient()
         client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
         try:
-            bootstrap_manager.add_event(f"Verbinde mit {ssh.host}:{ssh.port}...")
             client.connect(
                 hostname=ssh.host,
                 port=ssh.port,
@@ -484,75 +1197,449 @@ async def lmn_bootstrap(ssh: SSHConnection, data: Data = Depends(getData)):
                 password=ssh.password,
                 timeout=10,
             )
-            bootstrap_manager.add_event("Verbindung hergestellt. Starte Bootstrap...")
+            client.get_transport().set_keepalive(30)
+        except Exception:
+            # A failed connect or auth leaves the transport thread and socket open
+            client.close()
+            raise
+        with self._lock:
+            previous = self._sessions.get(key)
+            self._sessions[key] = (client, ssh.password, time.monotonic())
+        if previous is not None:
+            previous[0].close()
+        return client, False
+
+    def find(self, ssh: SSHConnection) -> paramiko.SSHClient | None:
+        # The live session for exactly this target, only with the password it
+        # was opened with. Unlike get() it never connects.
+        key = self._key(ssh)
+        now = time.monotonic()
+        with self._lock:
+            expired = self._expired(now)
+            found = None
+            cached = self._sessions.get(key)
+            if cached and secrets.compare_digest(cached[1].encode(), ssh.password.encode()):
+                self._sessions[key] = (cached[0], cached[1], now)
+                found = cached[0]
+        for client in expired:
+            client.close()
+        return found
+
+    def hosts(self) -> list[dict]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {"host": host, "port": port, "user": user, "idle_seconds": round(now - last_used, 1)}
+                for (host, port, user), (_, _, last_used) in self._sessions.items()
+            ]
+
+    def close(self, ssh: SSHConnection):
+        with self._lock:
+            cached = self._sessions.pop(self._key(ssh), None)
+        if cached is not None:
+            cached[0].close()
+
+    def close_all(self):
+        with self._lock:
+            clients = [client for client, _, _ in self._sessions.values()]
+            self._sessions.clear()
+        for client in clients:
+            client.close()
+
+
+ssh_sessions = SSHSessions()
+
+
+# Written by bootstrap.sh, the sha256 of the requirements.txt the target's venv was built from
+LMN_REQUIREMENTS_STAMP = "/opt/edulution-installer/venv/.requirements.sha256"
+
+
+def remote_requirements_hash(client: paramiko.SSHClient) -> str:
+    _, stdout, _ = client.exec_command(f"cat {LMN_REQUIREMENTS_STAMP} 2>/dev/null", timeout=10)
+    return stdout.read().decode("utf-8", "replace").strip()
+
+
+def push_payload(client: paramiko.SSHClient) -> tuple[str, bool] | None:
+    # Uploads bootstrap.sh, bundle and wheelhouse into a fresh directory on
+    # the target over SFTP, so the target downloads nothing itself. The
+    # wheelhouse is skipped if the target's venv already matches it.
+    # Returns (remote_dir, wheelhouse_pushed).
+    bundle = lmn_bundle.current()
+    if bundle is None:
+        return None
+    wheelhouse = lmn_wheelhouse.current()
+    if wheelhouse is not None and remote_requirements_hash(client) == wheelhouse[2]:
+        wheelhouse = None
+
+    _, stdout, _ = client.exec_command("mktemp -d /tmp/edulution-bootstrap.XXXXXX", timeout=10)
+    remote_dir = stdout.read().decode("utf-8", "replace").strip()
+    if not remote_dir:
+        return None
+
+    files = [LMN_INSTALLER_DIR / "bootstrap.sh", bundle[0]]
+    if wheelhouse is not None:
+        files.append(wheelhouse[0])
+    try:
+        with client.open_sftp() as sftp:
+            for path in files:
+                sftp.put(str(path), f"{remote_dir}/{path.name}")
+    except Exception:
+        try:
+            client.exec_command(f"rm -rf {remote_dir}", timeout=10)[1].channel.recv_exit_status()
+        except (OSError, paramiko.SSHException):
+            pass
+        raise
+    return remote_dir, wheelhouse is not None
 
-            bootstrap_cmd = (
-                f"tmpfile=$(mktemp) && "
-                f"curl -fsSL {BOOTSTRAP_URL} -o $tmpfile && "
-                f"GITHUB_BRANCH={BOOTSTRAP_BRANCH} bash $tmpfile; "
-                f"rm -f $tmpfile"
-            )
-            if ssh.user != "root":
-                command = f"sudo -S bash -c 'export GITHUB_BRANCH={BOOTSTRAP_BRANCH} && tmpfile=$(mktemp) && curl -fsSL {BOOTSTRAP_URL} -o $tmpfile && bash $tmpfile; rm -f $tmpfile'"
-                bootstrap_manager.add_event("Nicht als root verbunden, verwende sudo...")
-            else:
-                command = bootstrap_cmd
 
-            stdin, stdout, stderr = client.exec_command(command, get_pty=True)
+# Printed by bootstrap.sh as soon as the LMN-Installer API answers locally
+LMN_READY_MARKER = "EDULUTION_LMN_API_READY"
+LMN_READY_TIMEOUT = 60.0
+LMN_READY_MAX_DELAY = 2.0
 
-            if ssh.user != "root":
-                time.sleep(1)
-                stdin.write(ssh.password + "\n")
-                stdin.flush()
 
-            for line in stdout:
+def wait_for_lmn_api(host: str, on_retry=None) -> bool:
+    # Sofortiger erster Versuch, danach exponentielles Backoff mit Jitter
+    url = f"http://{host}:8000/api/health"
+    deadline = time.monotonic() + LMN_READY_TIMEOUT
+    delay = 0.1
+    attempt = 0
+    with requests.Session() as session:
+        while True:
+            attempt += 1
+            try:
+                resp = session.get(url, timeout=3)
+                if resp.status_code == 200:
+                    return True
+            except requests.RequestException:
+                pass
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if on_retry:
+                on_retry(attempt)
+            time.sleep(min(random.uniform(delay / 2, delay), remaining))
+            delay = min(delay * 2, LMN_READY_MAX_DELAY)
+
+
+SSH_READ_CHUNK = 64 * 1024
+SSH_SELECT_TIMEOUT = 1.0
+
+
+class LineSplitter:
+    # Splits received chunks into lines. The incomplete tail stays in one
+    # reusable buffer until the next chunk; decoding only happens at line
+    # boundaries, so multi-byte characters are never cut.
+    MAX_LINE = 1024 * 1024
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> list[str]:
+        self._buffer += data
+        end = self._buffer.rfind(b"\n")
+        if end < 0:
+            # Progress bars without newline must not grow the buffer forever
+            return self.flush() if len(self._buffer) > self.MAX_LINE else []
+        lines = self._buffer[:end].decode("utf-8", "replace").split("\n")
+        del self._buffer[:end + 1]
+        return lines
+
+    def flush(self) -> list[str]:
+        if not self._buffer:
+            return []
+        line = self._buffer.decode("utf-8", "replace")
+        self._buffer.clear()
+        return [line]
+
+
+def pump_channel(channel: paramiko.Channel, on_lines) -> int:
+    # Reads stdout and stderr of an exec channel in large chunks as they
+    # arrive and hands every chunk's lines to on_lines(lines, is_stderr) in
+    # one call. Returns the exit status.
+    stdout, stderr = LineSplitter(), LineSplitter()
+    while True:
+        # The channel's fileno() becomes readable on data for either stream and on EOF
+        select.select([channel], [], [], SSH_SELECT_TIMEOUT)
+        received = False
+        if channel.recv_ready():
+            on_lines(stdout.feed(channel.recv(SSH_READ_CHUNK)), False)
+            received = True
+        if channel.recv_stderr_ready():
+            on_lines(stderr.feed(channel.recv_stderr(SSH_READ_CHUNK)), True)
+            received = True
+        if not received and (channel.eof_received or channel.closed):
+            break
+    on_lines(stdout.flush(), False)
+    on_lines(stderr.flush(), True)
+    return channel.recv_exit_status()
+
+
+def run_bootstrap(ssh: SSHConnection, manager: BootstrapManager, scheme: str, port: int | None) -> bool:
+    # Runs bootstrap.sh on one target and reports into `manager`. Returns
+    # True once the LMN-Installer API on the target answers.
+    try:
+        manager.add_event(f"Verbinde mit {ssh.host}:{ssh.port}...")
+        client, reused = ssh_sessions.get(ssh)
+        if reused:
+            manager.add_event("Bestehende SSH-Sitzung wird wiederverwendet")
+        manager.add_event("Verbindung hergestellt. Starte Bootstrap...")
+
+        payload_dir = None
+        with_wheelhouse = True
+        installer_url = None
+        if lmn_bundle.current():
+            try:
+                pushed = push_payload(client)
+                if pushed:
+                    payload_dir, with_wheelhouse = pushed
+            except (OSError, paramiko.SSHException) as e:
+                manager.add_event(f"SFTP-Upload fehlgeschlagen ({e}), Ziel lädt Bundle selbst")
+            if payload_dir:
+                manager.add_event("LMN-Installer Bundle per SFTP übertragen")
+                if not with_wheelhouse and lmn_wheelhouse.current():
+                    manager.add_event("Python-Umgebung auf dem Ziel ist aktuell, Wheelhouse wird nicht übertragen")
+            else:
+                installer_url = installer_url_for(client, scheme, port)
+                if installer_url:
+                    manager.add_event(f"Lade LMN-Installer Bundle von {installer_url}")
+        if not payload_dir and not installer_url:
+            manager.add_event("Kein Bundle verfügbar, lade von GitHub")
+
+        bootstrap_cmd = bootstrap_script(installer_url, payload_dir, with_wheelhouse)
+        if ssh.user != "root":
+            command = f"sudo -S bash -c '{bootstrap_cmd}'"
+            manager.add_event("Nicht als root verbunden, verwende sudo...")
+        else:
+            command = bootstrap_cmd
+
+        stdin, stdout, _ = client.exec_command(command, get_pty=True)
+
+        if ssh.user != "root":
+            time.sleep(1)
+            stdin.write(ssh.password + "\n")
+            stdin.flush()
+
+        ready_signaled = False
+
+        def on_lines(lines: list[str], is_stderr: bool):
+            nonlocal ready_signaled
+            events = []
+            for line in lines:
                 line_stripped = line.rstrip()
+                if is_stderr:
+                    events.append(f"[STDERR] {line_stripped}")
+                    continue
                 if "[sudo]" in line_stripped and "password" in line_stripped:
                     continue
-                bootstrap_manager.add_event(line_stripped)
+                if line_stripped == LMN_READY_MARKER:
+                    ready_signaled = True
+                    events.append("LMN-Installer API meldet Bereitschaft")
+                    continue
+                events.append(line_stripped)
+            manager.add_events(events)
+
+        exit_status = pump_channel(stdout.channel, on_lines)
+
+        if exit_status != 0:
+            manager.add_event(
+                f"Bootstrap fehlgeschlagen (Exit-Code: {exit_status})", 'failed'
+            )
+            manager.finish('failed')
+            return False
+
+        if not ready_signaled:
+            manager.add_event("Warte auf LMN-Installer API...")
+        if wait_for_lmn_api(
+            ssh.host,
+            on_retry=lambda attempt: manager.add_event(f"Warte auf API... (Versuch {attempt})"),
+        ):
+            manager.add_event("LMN-Installer API ist bereit!")
+            manager.add_event("Bootstrap erfolgreich", 'done')
+            manager.finish('completed')
+            return True
+
+        manager.add_event("API nicht erreichbar nach Bootstrap", 'failed')
+        manager.finish('failed')
+
+    except paramiko.AuthenticationException:
+        manager.add_event("SSH-Authentifizierung fehlgeschlagen", 'failed')
+        manager.finish('failed')
+    except paramiko.SSHException as e:
+        ssh_sessions.close(ssh)
+        manager.add_event(f"SSH-Fehler: {e}", 'failed')
+        manager.finish('failed')
+    except Exception as e:
+        ssh_sessions.close(ssh)
+        manager.add_event(f"Fehler: {e}", 'failed')
+        manager.finish('failed')
+    return False
+
 
-            exit_status = stdout.channel.recv_exit_status()
+class BootstrapHosts:
+    # Hosts with a bootstrap in progress, shared by the single and the batch
+    # bootstrap so both never run against the same host at once
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: set[str] = set()
+
+    def claim(self, hosts: list[str]) -> list[str]:
+        # Claims all hosts or none; returns the ones already busy
+        with self._lock:
+            busy = [host for host in hosts if host in self._hosts]
+            if not busy:
+                self._hosts.update(hosts)
+            return busy
+
+    def release(self, host: str):
+        with self._lock:
+            self._hosts.discard(host)
+
+
+bootstrap_hosts = BootstrapHosts()
+
+
+class BootstrapOrchestrator:
+    # Bootstraps several targets with bounded concurrency. Every host gets
+    # its own BootstrapManager (event log and status). The summary manager
+    # receives a JSON snapshot of all host states on every state change, so
+    # the aggregate stream resumes by event id like the per-host streams.
+    def __init__(self, max_parallel: int):
+        self._max_parallel = max_parallel
+        self._lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+        self._hosts: dict[str, BootstrapManager] = {}
+        self._summary = BootstrapManager()
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def summary(self) -> BootstrapManager:
+        return self._summary
 
-            if exit_status != 0:
-                for line in stderr:
-                    bootstrap_manager.add_event(f"[STDERR] {line.rstrip()}")
-                bootstrap_manager.add_event(
-                    f"Bootstrap fehlgeschlagen (Exit-Code: {exit_status})", 'failed'
+    @property
+    def running(self) -> bool:
+        with self._lock:
+            return any(m.status in ('queued', 'running') for m in self._hosts.values())
+
+    def host(self, host: str) -> BootstrapManager | None:
+        with self._lock:
+            return self._hosts.get(host)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            hosts = {host: m.status for host, m in self._hosts.items()}
+        counts = {state: 0 for state in ('queued', 'running', 'completed', 'failed')}
+        for status in hosts.values():
+            counts[status] = counts.get(status, 0) + 1
+        return {"hosts": hosts, "total": len(hosts), **counts}
+
+    def start(
+        self,
+        targets: list[SSHConnection],
+        loop: asyncio.AbstractEventLoop,
+        scheme: str,
+        port: int | None,
+        on_success=None,
+    ):
+        # on_success(host) runs in the worker thread after a host's API answered
+        with self._lock:
+            if any(m.status in ('queued', 'running') for m in self._hosts.values()):
+                raise RuntimeError("Bootstrap läuft bereits")
+            busy = bootstrap_hosts.claim([ssh.host for ssh in targets])
+            if busy:
+                raise RuntimeError(f"Bootstrap läuft bereits für {', '.join(busy)}")
+            self._hosts = {}
+            for ssh in targets:
+                manager = BootstrapManager()
+                manager.bind_loop(loop)
+                manager.queue()
+                self._hosts[ssh.host] = manager
+            self._summary.bind_loop(loop)
+            self._summary.reset()
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_parallel,
+                    thread_name_prefix="bootstrap",
                 )
-                bootstrap_manager.finish('failed')
-                return
+            hosts = dict(self._hosts)
 
-            bootstrap_manager.add_event("Warte auf LMN-Installer API...")
-            for attempt in range(30):
-                try:
-                    resp = requests.get(f"http://{ssh.host}:8000/api/health", timeout=3)
-                    if resp.status_code == 200:
-                        data.DATA_LMN_TARGET_HOST = ssh.host
-                        bootstrap_manager.add_event("LMN-Installer API ist bereit!")
-                        bootstrap_manager.add_event("Bootstrap erfolgreich", 'done')
-                        bootstrap_manager.finish('completed')
-                        return
-                except Exception:
-                    pass
-                time.sleep(2)
-                bootstrap_manager.add_event(f"Warte auf API... (Versuch {attempt + 1}/30)")
-
-            bootstrap_manager.add_event("API nicht erreichbar nach Bootstrap", 'failed')
-            bootstrap_manager.finish('failed')
-
-        except paramiko.AuthenticationException:
-            bootstrap_manager.add_event("SSH-Authentifizierung fehlgeschlagen", 'failed')
-            bootstrap_manager.finish('failed')
-        except paramiko.SSHException as e:
-            bootstrap_manager.add_event(f"SSH-Fehler: {e}", 'failed')
-            bootstrap_manager.finish('failed')
-        except Exception as e:
-            bootstrap_manager.add_event(f"Fehler: {e}", 'failed')
-            bootstrap_manager.finish('failed')
+        self._publish()
+        for ssh in targets:
+            self._executor.submit(self._run_host, ssh, hosts[ssh.host], scheme, port, on_success)
+
+    def _run_host(
+        self, ssh: SSHConnection, manager: BootstrapManager, scheme: str, port: int | None, on_success
+    ):
+        manager.reset()
+        self._publish()
+        try:
+            if run_bootstrap(ssh, manager, scheme, port) and on_success is not None:
+                on_success(ssh.host)
         finally:
-            client.close()
+            bootstrap_hosts.release(ssh.host)
+            if manager.status == 'running':
+                manager.finish('failed')
+            self._publish()
+
+    def shutdown(self):
+        # Queued hosts are dropped. Running bootstraps end once
+        # ssh_sessions.close_all() closes their channels, so the worker
+        # threads do not hold up the exit.
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _publish(self):
+        # Serialized, so the last summary event is always the latest state
+        with self._publish_lock:
+            snapshot = self.snapshot()
+            self._summary.add_event(json.dumps(snapshot), 'summary')
+            if snapshot["queued"] == 0 and snapshot["running"] == 0:
+                self._summary.finish('failed' if snapshot["failed"] else 'completed')
+
+
+bootstrap_orchestrator = BootstrapOrchestrator(BOOTSTRAP_MAX_PARALLEL)
+
 
-    threading.Thread(target=run_bootstrap, daemon=True).start()
+def sse_response(manager: BootstrapManager, request: Request) -> StreamingResponse:
+    last_event_id = request.headers.get('last-event-id', '')
+    start_id = int(last_event_id) + 1 if last_event_id.isdigit() else 0
+
+    return StreamingResponse(
+        manager.stream_from(start_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@api.post("/lmn/bootstrap")
+async def lmn_bootstrap(ssh: SSHConnection, request: Request, data: Data = Depends(getData)):
+    if bootstrap_manager.status == 'running':
+        return JSONResponse(
+            status_code=409,
+            content={"status": False, "message": "Bootstrap läuft bereits"},
+        )
+    if bootstrap_hosts.claim([ssh.host]):
+        return JSONResponse(
+            status_code=409,
+            content={"status": False, "message": f"Bootstrap läuft bereits für {ssh.host}"},
+        )
+
+    bootstrap_manager.bind_loop(asyncio.get_running_loop())
+    bootstrap_manager.reset()
+    scheme, port = request.url.scheme, request.url.port
+
+    def run():
+        try:
+            if run_bootstrap(ssh, bootstrap_manager, scheme, port):
+                data.DATA_LMN_TARGET_HOST = ssh.host
+                lmn_upstream.health.mark_up(ssh.host)
+        finally:
+            bootstrap_hosts.release(ssh.host)
+
+    threading.Thread(target=run, daemon=True).start()
     return {"status": True, "message": "Bootstrap gestartet"}
 
 
@@ -563,15 +1650,121 @@ async def lmn_bootstrap_stream(request: Request):
             status_code=404,
             content={"status": False, "message": "Kein Bootstrap gestartet"},
         )
+    return sse_response(bootstrap_manager, request)
 
-    last_event_id = request.headers.get('last-event-id', '')
-    start_id = int(last_event_id) + 1 if last_event_id.isdigit() else 0
 
-    return StreamingResponse(
-        bootstrap_manager.stream_from(start_id),
-        media_type="text/event-stream",
-        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
-    )
+@api.post("/lmn/bootstrap/batch")
+async def lmn_bootstrap_batch(targets: list[SSHConnection], request: Request, data: Data = Depends(getData)):
+    hosts = [ssh.host for ssh in targets]
+    if not hosts or len(set(hosts)) != len(hosts):
+        return JSONResponse(
+            status_code=400,
+            content={"status": False, "message": "Mindestens ein Ziel, jeder Host nur einmal"},
+        )
+
+    def on_success(host: str):
+        # The first successful host becomes the target unless one is set,
+        # others can be selected via /lmn/bootstrap/batch/{host}/select
+        if not data.DATA_LMN_TARGET_HOST:
+            data.DATA_LMN_TARGET_HOST = host
+            lmn_upstream.health.mark_up(host)
+
+    try:
+        bootstrap_orchestrator.start(
+            targets, asyncio.get_running_loop(), request.url.scheme, request.url.port, on_success
+        )
+    except RuntimeError as e:
+        return JSONResponse(status_code=409, content={"status": False, "message": str(e)})
+    return {"status": True, "message": f"Bootstrap für {len(hosts)} Hosts gestartet", "hosts": hosts}
+
+
+@api.get("/lmn/bootstrap/batch")
+def lmn_bootstrap_batch_status():
+    return bootstrap_orchestrator.snapshot()
+
+
+@api.get("/lmn/bootstrap/batch/stream")
+async def lmn_bootstrap_batch_stream(request: Request):
+    if bootstrap_orchestrator.summary.status == 'idle':
+        return JSONResponse(
+            status_code=404,
+            content={"status": False, "message": "Kein Bootstrap gestartet"},
+        )
+    return sse_response(bootstrap_orchestrator.summary, request)
+
+
+@api.post("/lmn/bootstrap/batch/{host}/select")
+def lmn_bootstrap_batch_select(host: str, data: Data = Depends(getData)):
+    manager = bootstrap_orchestrator.host(host)
+    if manager is None or manager.status != 'completed':
+        return JSONResponse(
+            status_code=409,
+            content={"status": False, "message": f"Kein erfolgreicher Bootstrap für {host}"},
+        )
+    data.DATA_LMN_TARGET_HOST = host
+    lmn_upstream.health.mark_up(host)
+    return {"status": True, "message": f"{host} als LMN-Server ausgewählt"}
+
+
+@api.get("/lmn/bootstrap/batch/{host}/stream")
+async def lmn_bootstrap_host_stream(host: str, request: Request):
+    manager = bootstrap_orchestrator.host(host)
+    if manager is None:
+        return JSONResponse(
+            status_code=404,
+            content={"status": False, "message": f"Kein Bootstrap für {host}"},
+        )
+    return sse_response(manager, request)
+
+
+LMN_API_LOG = "/opt/edulution-installer/api.log"
+
+
+@api.get("/lmn/ssh/sessions")
+def lmn_ssh_sessions():
+    return ssh_sessions.hosts()
+
+
+@api.post("/lmn/ssh/log")
+async def lmn_ssh_log(ssh: SSHConnection, lines: int = 200):
+    # Same credentials as the bootstrap, a hostname alone must not grant a (root) shell
+    client = ssh_sessions.find(ssh)
+    if client is None:
+        return JSONResponse(
+            status_code=404,
+            content={"status": False, "message": f"Keine SSH-Sitzung zu {ssh.user}@{ssh.host}:{ssh.port}"},
+        )
+
+    def tail() -> tuple[int, str, str]:
+        _, stdout, stderr = client.exec_command(f"tail -n {max(1, min(lines, 10000))} {LMN_API_LOG}", timeout=10)
+        output = stdout.read().decode("utf-8", "replace")
+        return stdout.channel.recv_exit_status(), output, stderr.read().decode("utf-8", "replace")
+
+    try:
+        exit_status, output, error = await asyncio.to_thread(tail)
+        if exit_status != 0:
+            return JSONResponse(
+                status_code=404,
+                content={"status": False, "message": error.strip() or f"{LMN_API_LOG} nicht lesbar"},
+            )
+        return {"status": True, "log": output}
+    except (OSError, paramiko.SSHException) as e:
+        ssh_sessions.close(ssh)
+        return JSONResponse(
+            status_code=502,
+            content={"status": False, "message": f"SSH-Fehler: {e}"},
+        )
+
+
+@api.post("/lmn/ssh/close")
+def lmn_ssh_close(ssh: SSHConnection):
+    if ssh_sessions.find(ssh) is None:
+        return JSONResponse(
+            status_code=404,
+            content={"status": False, "message": f"Keine SSH-Sitzung zu {ssh.user}@{ssh.host}:{ssh.port}"},
+        )
+    ssh_sessions.close(ssh)
+    return {"status": True, "message": "SSH-Sitzung geschlossen"}
 
 
 @api.post("/lmn/check-connection")
@@ -580,12 +1773,18 @@ def check_lmn_connection(req: LmnConnectionCheck, data: Data = Depends(getData))
         resp = requests.get(f"http://{req.host}:8000/api/health", timeout=5)
         if resp.status_code == 200:
             data.DATA_LMN_TARGET_HOST = req.host
+            lmn_upstream.health.mark_up(req.host)
             return {"status": True, "message": "LMN-Server erreichbar"}
     except Exception:
         pass
     return {"status": False, "message": "LMN-Server nicht erreichbar"}
 
 
+@api.get("/lmn/proxy-health")
+def lmn_proxy_health():
+    return lmn_upstream.health.snapshot()
+
+
 @api.api_route("/lmn/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def lmn_proxy(path: str, request: Request, data: Data = Depends(getData)):
     if not data.DATA_LMN_TARGET_HOST:
@@ -594,34 +1793,58 @@ async def lmn_proxy(path: str, request: Request, data: Data = Depends(getData)):
             content={"status": False, "message": "LMN-Server nicht verbunden. Bootstrap zuerst ausfuehren."},
         )
 
-    target_url = f"http://{data.DATA_LMN_TARGET_HOST}:8000/api/{path}"
-    body = await request.body()
-    headers = dict(request.headers)
-    headers.pop("host", None)
+    host = data.DATA_LMN_TARGET_HOST
+    if lmn_upstream.health.is_down(host):
+        return JSONResponse(
+            status_code=503,
+            content={"status": False, "message": "LMN-Server nicht erreichbar"},
+            headers={"Retry-After": str(int(LMN_PROXY_RETRY_AFTER))},
+        )
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        try:
-            response = await client.request(
-                method=request.method,
-                url=target_url,
-                content=body,
-                headers=headers,
-                params=dict(request.query_params),
-            )
-            return JSONResponse(
-                status_code=response.status_code,
-                content=response.json(),
-            )
-        except httpx.ConnectError:
-            return JSONResponse(
-                status_code=503,
-                content={"status": False, "message": "LMN-Server nicht erreichbar"},
-            )
-        except Exception as e:
-            return JSONResponse(
-                status_code=502,
-                content={"status": False, "message": f"Proxy-Fehler: {e}"},
-            )
+    target_url = httpx.URL(
+        f"http://{host}:8000/api/{path}",
+        query=request.url.query.encode("utf-8"),
+    )
+    headers = {
+        key: value for key, value in request.headers.items()
+        if key.lower() not in HOP_BY_HOP_HEADERS
+    }
+
+    # Request- und Response-Body werden chunkweise durchgereicht und nie geparst
+    has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
+    upstream_request = lmn_upstream.client.build_request(
+        method=request.method,
+        url=target_url,
+        content=request.stream() if has_body else None,
+        headers=headers,
+        timeout=lmn_upstream.timeout_for(path),
+    )
+
+    try:
+        response = await lmn_upstream.client.send(upstream_request, stream=True)
+    except (httpx.ConnectError, httpx.ConnectTimeout):
+        lmn_upstream.health.mark_down(host)
+        return JSONResponse(
+            status_code=503,
+            content={"status": False, "message": "LMN-Server nicht erreichbar"},
+        )
+    except Exception as e:
+        return JSONResponse(
+            status_code=502,
+            content={"status": False, "message": f"Proxy-Fehler: {e}"},
+        )
+
+    lmn_upstream.health.mark_up(host)
+    response_headers = {
+        key: value for key, value in response.headers.items()
+        if key.lower() not in HOP_BY_HOP_HEADERS
+    }
+    return StreamingResponse(
+        response.aiter_raw(),
+        status_code=response.status_code,
+        headers=response_headers,
+        background=BackgroundTask(response.aclose),
+    )
 
 
 # --- Register API Router ---
@@ -639,6 +1862,8 @@ async def lmn_ws_proxy(websocket: WebSocket, path: str):
 
     await websocket.accept()
     target_url = f"ws://{data.DATA_LMN_TARGET_HOST}:8000/ws/{path}"
+    if websocket.url.query:
+        target_url += f"?{websocket.url.query}"
 
     try:
         import websockets
@@ -41,10 +41,19 @@ interface LeCertificateResponse extends StatusResponse {
   registration?: AcmeDnsRegistration;
 }
 
+export class ApiError extends Error {
+  readonly status: number;
+
+  constructor(status: number) {
+    super(`API error: ${status}`);
+    this.status = status;
+  }
+}
+
 const apiFetch = async <T>(url: string, options?: RequestInit): Promise<T> => {
   const response = await fetch(url, options);
   if (!response.ok) {
-    throw new Error(`API error: ${response.status}`);
+    throw new ApiError(response.status);
   }
   return response.json() as Promise<T>;
 };
@@ -72,6 +81,36 @@ export const checkLdapStatus = (): Promise<StatusResponse> => apiFetch<StatusRes
 export const checkLdapAccessStatus = (): Promise<StatusResponse> =>
   apiFetch<StatusResponse>('/api/check-ldap-access-status');
 
+export interface PreflightCheck extends StatusResponse {
+  name: string;
+  required: boolean;
+  latency_ms: number;
+}
+
+export const streamPreflight = async (onCheck: (check: PreflightCheck) => void): Promise<void> => {
+  const response = await fetch('/api/preflight?stream=true');
+  if (!response.ok || !response.body) {
+    throw new Error(`API error: ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop() ?? '';
+    lines
+      .filter((line) => line.trim())
+      .forEach((line) => {
+        const parsed = JSON.parse(line) as { check?: PreflightCheck };
+        if (parsed.check) onCheck(parsed.check);
+      });
+  }
+};
+
 export const submitAdminGroup = (adminGroup: string): Promise<StatusResponse> =>
   apiFetch<StatusResponse>('/api/set-admin-group', {
     method: 'POST',
@@ -223,9 +262,14 @@ export const startLmnPlaybook = (
     body: JSON.stringify({ variables: { extra_vars: extraVars } }),
   });
 
-export const createLmnWebSocket = (): WebSocket => {
+export const createLmnWebSocket = (since?: number, jobId?: string): WebSocket => {
   const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-  return new WebSocket(`${protocol}//${window.location.host}/ws/lmn/output`);
+  // seq is numbered per job: without job_id the API replays the current job
+  const params = new URLSearchParams();
+  if (since !== undefined) params.set('since', String(since));
+  if (jobId) params.set('job_id', jobId);
+  const query = params.toString() ? `?${params.toString()}` : '';
+  return new WebSocket(`${protocol}//${window.location.host}/ws/lmn/output${query}`);
 };
 
 export interface EdulutionConfig {
@@ -236,11 +280,30 @@ export interface EdulutionConfig {
 export const getEdulutionConfig = (): Promise<EdulutionConfig> =>
   apiFetch<EdulutionConfig>('/api/lmn/edulution-config');
 
+export interface LmnInterfaceAddress {
+  address: string;
+  prefixlen: number;
+}
+
+export interface LmnNetworkInterface {
+  name: string;
+  mac: string | null;
+  mtu: number | null;
+  state: string | null;
+  speed_mbps: number | null;
+  ipv4: LmnInterfaceAddress[];
+  ipv6: LmnInterfaceAddress[];
+}
+
 export interface LmnNetworkInfo {
   ip?: string;
   netmask?: string;
   gateway?: string;
+  gateway6?: string;
+  interface?: string;
   hostname?: string;
+  interfaces?: LmnNetworkInterface[];
+  dns?: string[];
 }
 
 export const getLmnNetworkInfo = (): Promise<LmnNetworkInfo> =>
@@ -3,11 +3,24 @@ import { useNavigate } from 'react-router-dom';
 import { useTranslation } from 'react-i18next';
 import { Button } from '@edulution-io/ui-kit';
 import useInstallerStore from '../store/useInstallerStore';
-import { checkApiStatus, checkWebDavStatus, checkLdapStatus, checkLdapAccessStatus } from '../api/installerApi';
+import {
+  checkApiStatus,
+  checkWebDavStatus,
+  checkLdapStatus,
+  checkLdapAccessStatus,
+  streamPreflight,
+} from '../api/installerApi';
 import StatusCard from '../components/StatusCard';
 
 type CheckKey = 'api' | 'webdav' | 'ldap' | 'ldapAccess';
 
+const PREFLIGHT_KEYS: Record<string, CheckKey> = {
+  api: 'api',
+  webdav: 'webdav',
+  ldap: 'ldap',
+  ldap_access: 'ldapAccess',
+};
+
 const CheckPage = () => {
   const navigate = useNavigate();
   const { t } = useTranslation();
@@ -34,16 +47,29 @@ const CheckPage = () => {
     [setCheckResult],
   );
 
-  const runAllChecks = useCallback(() => {
+  const runAllChecks = useCallback(async () => {
     resetChecks();
-    void runCheck('api', checkApiStatus);
-    void runCheck('webdav', checkWebDavStatus);
-    void runCheck('ldap', checkLdapStatus);
-    void runCheck('ldapAccess', checkLdapAccessStatus);
-  }, [resetChecks, runCheck]);
+    setLoading({ api: true, webdav: true, ldap: true, ldapAccess: true });
+    try {
+      await streamPreflight((check) => {
+        const key = PREFLIGHT_KEYS[check.name];
+        if (!key) return;
+        setCheckResult(key, { status: check.status, message: check.message });
+        setLoading((prev) => ({ ...prev, [key]: false }));
+      });
+    } catch {
+      // Fallback: einzelne Prüfungen
+      void runCheck('api', checkApiStatus);
+      void runCheck('webdav', checkWebDavStatus);
+      void runCheck('ldap', checkLdapStatus);
+      void runCheck('ldapAccess', checkLdapAccessStatus);
+      return;
+    }
+    setLoading({ api: false, webdav: false, ldap: false, ldapAccess: false });
+  }, [resetChecks, runCheck, setCheckResult]);
 
   useEffect(() => {
-    runAllChecks();
+    void runAllChecks();
   }, []);
 
   const allPassed =
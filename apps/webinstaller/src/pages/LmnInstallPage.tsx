@@ -6,6 +6,7 @@ import { FontAwesomeIcon } from '@fortawesome/react-fontawesome';
 import { faSpinner, faCircleCheck, faCircleXmark, faTriangleExclamation } from '@fortawesome/free-solid-svg-icons';
 import useInstallerStore from '../store/useInstallerStore';
 import {
+  ApiError,
   startLmnPlaybook,
   createLmnWebSocket,
   getEdulutionConfig,
@@ -13,6 +14,9 @@ import {
   shutdownLmnInstaller,
 } from '../api/installerApi';
 
+const WS_MAX_RECONNECTS = 5;
+const WS_RECONNECT_DELAY_MS = 2000;
+
 const LmnInstallPage = () => {
   const navigate = useNavigate();
   const { t } = useTranslation();
@@ -27,6 +31,11 @@ const LmnInstallPage = () => {
   const wsRef = useRef<WebSocket | null>(null);
   const wsOpenedRef = useRef(false);
   const finalStatusRef = useRef(false);
+  // Job whose output is shown and the last seq received per job
+  const jobIdRef = useRef<string | null>(null);
+  const lastSeqRef = useRef<Map<string, number>>(new Map());
+  const reconnectsRef = useRef(0);
+  const reconnectTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null);
 
   useEffect(() => {
     if (logRef.current) {
@@ -34,6 +43,73 @@ const LmnInstallPage = () => {
     }
   }, [store.lmnOutputLog]);
 
+  const connectOutput = useCallback(
+    (since?: number, jobId?: string) => {
+      const ws = createLmnWebSocket(since, jobId);
+      wsRef.current = ws;
+      wsOpenedRef.current = false;
+
+      ws.onopen = () => {
+        wsOpenedRef.current = true;
+        reconnectsRef.current = 0;
+        setWsError(null);
+      };
+
+      ws.onmessage = (event) => {
+        try {
+          const msg = JSON.parse(event.data as string) as {
+            type: string;
+            data: string;
+            job_id?: string | null;
+            seq?: number | null;
+          };
+          if (msg.job_id) {
+            if (!jobIdRef.current) jobIdRef.current = msg.job_id;
+            if (typeof msg.seq === 'number') {
+              lastSeqRef.current.set(msg.job_id, msg.seq);
+            }
+          }
+          if (msg.type === 'stdout' || msg.type === 'stderr') {
+            store.appendLmnOutput(msg.data);
+          } else if (msg.type === 'status') {
+            if (msg.data === 'successful' || msg.data === 'completed') {
+              finalStatusRef.current = true;
+              store.setLmnPlaybookStatus('completed');
+            } else if (msg.data === 'failed') {
+              finalStatusRef.current = true;
+              store.setLmnPlaybookStatus('failed');
+            }
+          } else if (msg.type === 'event') {
+            store.appendLmnOutput(msg.data);
+          }
+        } catch {
+          store.appendLmnOutput(event.data as string);
+        }
+      };
+
+      // onerror is always followed by onclose, which handles both
+      ws.onclose = () => {
+        if (finalStatusRef.current || wsRef.current !== ws) return;
+        const message = wsOpenedRef.current
+          ? t('lmnInstall.wsConnectionLost')
+          : t('lmnInstall.wsConnectionFailed');
+        setWsError(message);
+
+        // Resume after the last received message, the API replays what was missed
+        if (reconnectsRef.current < WS_MAX_RECONNECTS) {
+          reconnectsRef.current += 1;
+          const jobId = jobIdRef.current ?? undefined;
+          const since = (jobId && lastSeqRef.current.get(jobId)) || 0;
+          reconnectTimerRef.current = setTimeout(() => connectOutput(since, jobId), WS_RECONNECT_DELAY_MS);
+          return;
+        }
+        store.appendLmnOutput(`[ERROR] ${message}`);
+        store.setLmnPlaybookStatus('failed');
+      };
+    },
+    [store, t],
+  );
+
   const startInstallation = useCallback(async () => {
     if (started) return;
     setStarted(true);
@@ -41,61 +117,17 @@ const LmnInstallPage = () => {
     store.setLmnPlaybookStatus('running');
 
     // Connect WebSocket first
-    const ws = createLmnWebSocket();
-    wsRef.current = ws;
-    wsOpenedRef.current = false;
     finalStatusRef.current = false;
+    jobIdRef.current = null;
+    lastSeqRef.current.clear();
+    reconnectsRef.current = 0;
     setWsError(null);
-
-    ws.onopen = () => {
-      wsOpenedRef.current = true;
-    };
-
-    ws.onmessage = (event) => {
-      try {
-        const msg = JSON.parse(event.data as string) as { type: string; data: string };
-        if (msg.type === 'stdout' || msg.type === 'stderr') {
-          store.appendLmnOutput(msg.data);
-        } else if (msg.type === 'status') {
-          if (msg.data === 'successful' || msg.data === 'completed') {
-            finalStatusRef.current = true;
-            store.setLmnPlaybookStatus('completed');
-          } else if (msg.data === 'failed') {
-            finalStatusRef.current = true;
-            store.setLmnPlaybookStatus('failed');
-          }
-        } else if (msg.type === 'event') {
-          store.appendLmnOutput(msg.data);
-        }
-      } catch {
-        store.appendLmnOutput(event.data as string);
-      }
-    };
-
-    ws.onerror = () => {
-      if (finalStatusRef.current) return;
-      const message = wsOpenedRef.current
-        ? t('lmnInstall.wsConnectionLost')
-        : t('lmnInstall.wsConnectionFailed');
-      setWsError(message);
-      store.appendLmnOutput(`[ERROR] ${message}`);
-      store.setLmnPlaybookStatus('failed');
-    };
-
-    ws.onclose = () => {
-      if (finalStatusRef.current) return;
-      const message = wsOpenedRef.current
-        ? t('lmnInstall.wsConnectionLost')
-        : t('lmnInstall.wsConnectionFailed');
-      setWsError(message);
-      store.appendLmnOutput(`[ERROR] ${message}`);
-      store.setLmnPlaybookStatus('failed');
-    };
+    connectOutput();
 
     // Start the playbook
     try {
       const currentStore = useInstallerStore.getState();
-      await startLmnPlaybook('linuxmuster.yml', {
+      const response = await startLmnPlaybook('linuxmuster.yml', {
         lmn_server_ip: currentStore.lmnServerIp,
         lmn_netmask: currentStore.lmnNetmask,
         lmn_gateway: currentStore.lmnGateway,
@@ -110,11 +142,23 @@ const LmnInstallPage = () => {
         lmn_timezone: currentStore.lmnTimezone,
         lmn_locale: currentStore.lmnLocale,
       });
-    } catch {
+      jobIdRef.current = response.job_id;
+    } catch (error) {
+      // 409: the playbook is already running (page reload), rebuild the log
+      // from the start of the running job and keep following it
+      if (error instanceof ApiError && error.status === 409) {
+        wsRef.current?.close();
+        store.clearLmnOutput();
+        store.appendLmnOutput(t('lmnInstall.playbookAlreadyRunning'));
+        jobIdRef.current = null;
+        lastSeqRef.current.clear();
+        connectOutput(0);
+        return;
+      }
       store.appendLmnOutput(t('lmnInstall.playbookError'));
       store.setLmnPlaybookStatus('failed');
     }
-  }, [started, store]);
+  }, [started, store, connectOutput]);
 
   // Auto-fetch config from LMN API as soon as playbook completes
   useEffect(() => {
@@ -182,9 +226,12 @@ const LmnInstallPage = () => {
   useEffect(() => {
     void startInstallation();
     return () => {
-      if (wsRef.current) {
-        wsRef.current.close();
+      if (reconnectTimerRef.current) {
+        clearTimeout(reconnectTimerRef.current);
       }
+      const ws = wsRef.current;
+      wsRef.current = null;
+      ws?.close();
     };
   }, []);
 
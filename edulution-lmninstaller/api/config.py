@@ -8,6 +8,26 @@ class Settings(BaseSettings):
     playbook_dir: Path = Path("/opt/edulution-installer/playbooks")
     private_data_dir: Path = Path("/opt/edulution-installer/ansible")
     shutdown_delay: int = 5
+    max_parallel_jobs: int = 1
+    job_queue_size: int = 10
+    job_history: int = 20
+    ansible_profile: str = "default"
+    fact_cache_timeout: int = 3600
+    profile_history: int = 20
+    artifact_keep_jobs: int = 20
+    artifact_max_age_days: int = 30
+    artifact_max_bytes: int = 500 * 1024 * 1024
+    facts_ttl: int = 30
+    benchmark_ttl: int = 600
+    benchmark_size_mb: int = 64
+    benchmark_runtime: float = 6.0
+    ws_send_queue_size: int = 1000
+    ws_slow_consumer_policy: str = "coalesce"
+    ws_replay_max_bytes: int = 4 * 1024 * 1024
+    ws_replay_spill_dir: Path | None = None
+    ws_replay_jobs: int = 3
+    ws_batch_max_messages: int = 200
+    ws_batch_latency: float = 0.02
 
     class Config:
         env_prefix = "EDULUTION_"
@@ -8,9 +8,11 @@ from pydantic import BaseModel, Field
 
 class JobStatus(str, Enum):
     IDLE = "idle"
+    QUEUED = "queued"
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
 
 
 class CheckStatus(str, Enum):
@@ -35,7 +37,10 @@ class DiskInfo(BaseModel):
 class SystemInfo(BaseModel):
     os: str | None = None
     os_version: str | None = None
+    kernel: str | None = None
     ram_gb: float | None = None
+    swap_gb: float | None = None
+    cpu_cores: int | None = None
     disks: list[DiskInfo] = Field(default_factory=list)
 
 
@@ -50,8 +55,19 @@ class PlaybookVariables(BaseModel):
     extra_vars: dict[str, Any] = Field(default_factory=dict)
 
 
+class ExecutionProfile(str, Enum):
+    DEFAULT = "default"
+    FAST = "fast"
+
+
+class ResumeMode(str, Enum):
+    TASK = "task"
+    CHECKPOINT = "checkpoint"
+
+
 class PlaybookStartRequest(BaseModel):
     variables: PlaybookVariables = Field(default_factory=PlaybookVariables)
+    profile: ExecutionProfile | None = None
 
 
 class PlaybookStartResponse(BaseModel):
@@ -68,6 +84,57 @@ class StatusResponse(BaseModel):
     return_code: int | None = None
 
 
+class JobInfo(BaseModel):
+    job_id: UUID
+    playbook: str
+    profile: ExecutionProfile
+    status: JobStatus
+    queued_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    return_code: int | None = None
+    content_hash: str | None = None
+    completed_tasks: int = 0
+    failed_task: str | None = None
+    start_at_task: str | None = None
+    resumed_from: UUID | None = None
+
+
+class TaskTiming(BaseModel):
+    name: str
+    play: str
+    status: str
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    duration: float
+    previous_duration: float | None = None
+    delta: float | None = None
+
+
+class PlayTiming(BaseModel):
+    name: str
+    tasks: int
+    duration: float
+
+
+class JobProfile(BaseModel):
+    job_id: UUID
+    playbook: str
+    total_duration: float
+    previous_runs: int
+    previous_total_duration: float | None = None
+    tasks: list[TaskTiming] = Field(default_factory=list)
+    plays: list[PlayTiming] = Field(default_factory=list)
+
+
+class JobEventsPage(BaseModel):
+    job_id: UUID
+    offset: int
+    limit: int
+    next_offset: int | None = None
+    events: list[dict[str, Any]] = Field(default_factory=list)
+
+
 class MessageType(str, Enum):
     STDOUT = "stdout"
     STDERR = "stderr"
@@ -80,3 +147,19 @@ class WebSocketMessage(BaseModel):
     data: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     job_id: UUID | None = None
+    seq: int | None = None
+
+
+class SlowConsumerPolicy(str, Enum):
+    DROP = "drop"
+    COALESCE = "coalesce"
+    DISCONNECT = "disconnect"
+
+
+class StreamStats(BaseModel):
+    connections: int
+    policy: SlowConsumerPolicy
+    queue_size: int
+    dropped_total: int
+    disconnected_slow: int
+    pending: list[int] = Field(default_factory=list)
@@ -1,19 +1,28 @@
+import asyncio
 import json
 import os
 import signal
 import threading
 from pathlib import Path
+from uuid import UUID
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 
 from api.models import (
+    JobEventsPage,
+    JobInfo,
+    JobProfile,
     JobStatus,
     PlaybookStartRequest,
     PlaybookStartResponse,
     RequirementsResponse,
+    ResumeMode,
     StatusResponse,
 )
 from api.services.ansible_runner import runner_service
+from api.services.artifact_store import artifact_store
+from api.services.network_info import network_info
+from api.services.requirement_engine import RequirementSpecError
 from api.services.system_checker import system_checker
 
 EDULUTION_CONFIG_PATH = Path("/var/lib/edulution/binduser-config.json")
@@ -41,79 +50,130 @@ async def get_status() -> StatusResponse:
 async def start_playbook(
     playbook: str, request: PlaybookStartRequest
 ) -> PlaybookStartResponse:
-    if runner_service.status == JobStatus.RUNNING:
-        raise HTTPException(
-            status_code=409,
-            detail="A playbook is already running",
-        )
-
     try:
-        job_id = await runner_service.run_playbook(
+        job = await runner_service.run_playbook(
             playbook=playbook,
             extra_vars=request.variables.extra_vars,
+            profile=request.profile,
         )
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
     return PlaybookStartResponse(
+        job_id=job.job_id,
+        status=job.status,
+        message=(
+            "Playbook started successfully"
+            if job.status == JobStatus.RUNNING
+            else "Playbook queued"
+        ),
+    )
+
+
+@router.get("/jobs", response_model=list[JobInfo])
+async def list_jobs() -> list[JobInfo]:
+    return runner_service.list_jobs()
+
+
+@router.get("/jobs/{job_id}", response_model=JobInfo)
+async def get_job(job_id: UUID) -> JobInfo:
+    job = runner_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}/profile", response_model=JobProfile)
+async def get_job_profile(job_id: UUID, top: int = Query(10, ge=1, le=100)) -> JobProfile:
+    profile = await asyncio.to_thread(runner_service.get_profile, job_id, top)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return profile
+
+
+@router.get("/jobs/{job_id}/events", response_model=JobEventsPage)
+async def get_job_events(
+    job_id: UUID,
+    task: str | None = None,
+    status: str | None = None,
+    host: str | None = None,
+    q: str | None = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+) -> JobEventsPage:
+    if not artifact_store.exists(job_id):
+        raise HTTPException(status_code=404, detail="No artifacts for this job")
+    events, next_offset = await asyncio.to_thread(
+        artifact_store.search, job_id, task, status, host, q, offset, limit
+    )
+    return JobEventsPage(
         job_id=job_id,
-        status=JobStatus.RUNNING,
-        message="Playbook started successfully",
+        offset=offset,
+        limit=limit,
+        next_offset=next_offset,
+        events=events,
     )
 
 
-@router.get(
-    "/playbook/{playbook}/requirements", response_model=RequirementsResponse
-)
-async def check_requirements(playbook: str) -> RequirementsResponse:
-    return system_checker.check_requirements(playbook)
+@router.post("/jobs/{job_id}/resume", response_model=PlaybookStartResponse)
+async def resume_job(
+    job_id: UUID, mode: ResumeMode = ResumeMode.CHECKPOINT
+) -> PlaybookStartResponse:
+    try:
+        job = await runner_service.resume_job(job_id, mode)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
 
+    return PlaybookStartResponse(
+        job_id=job.job_id,
+        status=job.status,
+        message=(
+            f"Resuming at task: {job.start_at_task}"
+            if job.start_at_task
+            else "Restarting playbook from the beginning"
+        ),
+    )
 
-@router.get("/network-info")
-async def get_network_info() -> dict:
-    import subprocess
 
-    result: dict = {}
+@router.delete("/jobs/{job_id}", response_model=JobInfo)
+async def cancel_job(job_id: UUID) -> JobInfo:
+    if runner_service.get_job(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job = runner_service.cancel_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=409, detail="Only queued jobs can be cancelled")
+    return job
+
+
+@router.get(
+    "/playbook/{playbook}/requirements", response_model=RequirementsResponse
+)
+async def check_requirements(
+    playbook: str, refresh: bool = False
+) -> RequirementsResponse:
+    if refresh:
+        system_checker.invalidate()
     try:
-        out = subprocess.run(
-            ["ip", "-j", "route", "show", "default"],
-            capture_output=True, text=True, timeout=5,
+        return await asyncio.to_thread(system_checker.check_requirements, playbook)
+    except RequirementSpecError as e:
+        raise HTTPException(
+            status_code=422,
+            detail={"message": f"Invalid requirements/{playbook}: {e}", "entry": e.entry},
         )
-        if out.returncode == 0:
-            import json as _json
-            routes = _json.loads(out.stdout)
-            if routes:
-                result["gateway"] = routes[0].get("gateway", "")
-                iface = routes[0].get("dev", "")
-                result["interface"] = iface
-
-                addr_out = subprocess.run(
-                    ["ip", "-j", "-4", "addr", "show", iface],
-                    capture_output=True, text=True, timeout=5,
-                )
-                if addr_out.returncode == 0:
-                    addrs = _json.loads(addr_out.stdout)
-                    if addrs and addrs[0].get("addr_info"):
-                        info = addrs[0]["addr_info"][0]
-                        result["ip"] = info.get("local", "")
-                        prefix = info.get("prefixlen", 24)
-                        # CIDR prefix to subnet mask
-                        mask_int = (0xFFFFFFFF << (32 - prefix)) & 0xFFFFFFFF
-                        result["netmask"] = ".".join(
-                            str((mask_int >> (8 * i)) & 0xFF) for i in range(3, -1, -1)
-                        )
-    except Exception:
-        pass
 
-    try:
-        import socket
-        result["hostname"] = socket.gethostname()
-    except Exception:
-        pass
 
-    return result
+@router.get("/network-info")
+async def get_network_info(refresh: bool = False) -> dict:
+    if refresh:
+        network_info.invalidate()
+    # Collecting reads /proc, /sys and a netlink dump, keep it off the event loop
+    return await asyncio.to_thread(network_info.get)
 
 
 @router.get("/edulution-config")
@@ -1,15 +1,27 @@
+from uuid import UUID
+
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from api.models import StreamStats
 from api.services.output_streamer import streamer
 
 router = APIRouter(tags=["websocket"])
 
 
 @router.websocket("/ws/output")
-async def websocket_output(websocket: WebSocket) -> None:
-    await streamer.connect(websocket)
+async def websocket_output(
+    websocket: WebSocket, since: int | None = None, job_id: UUID | None = None
+) -> None:
+    await streamer.connect(websocket, since=since, job_id=job_id)
     try:
         while True:
             await websocket.receive_text()
     except WebSocketDisconnect:
+        pass
+    finally:
         streamer.disconnect(websocket)
+
+
+@router.get("/api/output/stats", response_model=StreamStats)
+async def output_stats() -> StreamStats:
+    return streamer.stats()
@@ -1,5 +1,9 @@
-import asyncio
-import os
+import logging
+import shlex
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Callable
@@ -8,130 +12,415 @@ from uuid import UUID, uuid4
 import ansible_runner
 
 from api.config import settings
-from api.models import JobStatus, MessageType
+from api.models import (
+    ExecutionProfile,
+    JobInfo,
+    JobProfile,
+    JobStatus,
+    MessageType,
+    ResumeMode,
+)
+from api.services.artifact_store import artifact_store
+from api.services.checkpoints import find_checkpoints, resume_point
 from api.services.output_streamer import streamer
+from api.services.playbook_stager import stager
+from api.services.task_profiler import TaskProfiler, build_profile, profile_store
+
+
+logger = logging.getLogger(__name__)
+
+INVENTORY = "localhost ansible_connection=local\n"
+
+
+def profile_options(profile: ExecutionProfile) -> dict[str, Any]:
+    """Extra ansible_runner.run() arguments for an execution profile.
+
+    Passed per run instead of via env/settings and env/envvars, so the job
+    directories only ever hold the inventory.
+    """
+    if profile != ExecutionProfile.FAST:
+        return {}
+
+    return {
+        # An absolute path keeps the cache outside the per-job artifact dir,
+        # so facts survive re-runs after a failure
+        "fact_cache": str(settings.private_data_dir / "fact_cache"),
+        "fact_cache_type": "jsonfile",
+        "suppress_env_files": True,
+        "envvars": {
+            "ANSIBLE_PIPELINING": "True",
+            "ANSIBLE_GATHERING": "smart",
+            "ANSIBLE_CACHE_PLUGIN_TIMEOUT": str(settings.fact_cache_timeout),
+            "ANSIBLE_CALLBACKS_ENABLED": "",
+            "ANSIBLE_RETRY_FILES_ENABLED": "False",
+            "ANSIBLE_INTERNAL_POLL_INTERVAL": "0.001",
+        },
+    }
+
+
+class _Job:
+    __slots__ = (
+        "job_id",
+        "playbook",
+        "extra_vars",
+        "profile",
+        "status",
+        "queued_at",
+        "started_at",
+        "finished_at",
+        "return_code",
+        "future",
+        "profiler",
+        "content_hash",
+        "started_tasks",
+        "failed_task",
+        "start_at_task",
+        "resumed_from",
+    )
+
+    def __init__(
+        self, playbook: str, extra_vars: dict[str, Any], profile: ExecutionProfile
+    ):
+        self.job_id = uuid4()
+        self.playbook = playbook
+        self.extra_vars = extra_vars
+        self.profile = profile
+        self.status = JobStatus.QUEUED
+        self.queued_at = datetime.utcnow()
+        self.started_at: datetime | None = None
+        self.finished_at: datetime | None = None
+        self.return_code: int | None = None
+        self.future: Future | None = None
+        self.profiler = TaskProfiler()
+        self.content_hash: str | None = None
+        self.started_tasks: list[str] = []
+        self.failed_task: str | None = None
+        self.start_at_task: str | None = None
+        self.resumed_from: UUID | None = None
+
+    def info(self) -> JobInfo:
+        return JobInfo(
+            job_id=self.job_id,
+            playbook=self.playbook,
+            profile=self.profile,
+            status=self.status,
+            queued_at=self.queued_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            return_code=self.return_code,
+            content_hash=self.content_hash,
+            completed_tasks=len(self.started_tasks) - (1 if self.failed_task else 0),
+            failed_task=self.failed_task,
+            start_at_task=self.start_at_task,
+            resumed_from=self.resumed_from,
+        )
 
 
 class AnsibleRunnerService:
     def __init__(self):
-        self._status: JobStatus = JobStatus.IDLE
-        self._job_id: UUID | None = None
-        self._started_at: datetime | None = None
-        self._finished_at: datetime | None = None
-        self._return_code: int | None = None
-        self._thread = None
+        self._lock = threading.Lock()
+        self._jobs: OrderedDict[UUID, _Job] = OrderedDict()
+        self._executor: ThreadPoolExecutor | None = None
+        # Jobs currently running from the shared project/ directory
+        self._project_lock = threading.Lock()
+        self._project_users = 0
         self._shutdown_callback: Callable[[], None] | None = None
 
+    def _latest(self) -> _Job | None:
+        # The most recently started job backs the single-job /api/status view
+        with self._lock:
+            for job in reversed(self._jobs.values()):
+                if job.started_at is not None:
+                    return job
+        return None
+
     @property
     def status(self) -> JobStatus:
-        return self._status
+        with self._lock:
+            if any(j.status == JobStatus.RUNNING for j in self._jobs.values()):
+                return JobStatus.RUNNING
+        job = self._latest()
+        return job.status if job else JobStatus.IDLE
 
     @property
     def job_id(self) -> UUID | None:
-        return self._job_id
+        job = self._latest()
+        return job.job_id if job else None
 
     @property
     def started_at(self) -> datetime | None:
-        return self._started_at
+        job = self._latest()
+        return job.started_at if job else None
 
     @property
     def finished_at(self) -> datetime | None:
-        return self._finished_at
+        job = self._latest()
+        return job.finished_at if job else None
 
     @property
     def return_code(self) -> int | None:
-        return self._return_code
+        job = self._latest()
+        return job.return_code if job else None
 
     def set_shutdown_callback(self, callback: Callable[[], None]) -> None:
         self._shutdown_callback = callback
 
-    def _event_handler(self, event: dict[str, Any]) -> bool:
+    def get_job(self, job_id: UUID) -> JobInfo | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.info() if job else None
+
+    def list_jobs(self) -> list[JobInfo]:
+        with self._lock:
+            return [job.info() for job in reversed(self._jobs.values())]
+
+    def cancel_job(self, job_id: UUID) -> JobInfo | None:
+        """Cancel a queued job. Running jobs cannot be cancelled."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != JobStatus.QUEUED:
+                return None
+            if job.future is not None and not job.future.cancel():
+                return None
+            job.status = JobStatus.CANCELLED
+            job.finished_at = datetime.utcnow()
+            self._prune_history()
+        streamer.queue_message(MessageType.STATUS, "cancelled", job_id)
+        return job.info()
+
+    def get_profile(self, job_id: UUID, top: int) -> JobProfile | None:
+        profile_dir = settings.private_data_dir / "profiles"
+        with self._lock:
+            job = self._jobs.get(job_id)
+
+        if job is not None:
+            # Compare with runs that finished before this one started, not with
+            # a parallel or later run of the same playbook
+            previous = profile_store.load(
+                profile_dir, job.playbook, before=job.started_at or job.queued_at
+            )
+            return build_profile(
+                job_id, job.playbook, job.profiler.snapshot(), previous, top
+            )
+
+        found = profile_store.find(profile_dir, job_id)
+        if found is None:
+            return None
+        playbook, run, previous = found
+        return build_profile(job_id, playbook, run["tasks"], previous, top)
+
+    def _prune_history(self) -> None:
+        finished = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.status not in (JobStatus.QUEUED, JobStatus.RUNNING)
+        ]
+        for job_id in finished[: max(len(finished) - settings.job_history, 0)]:
+            del self._jobs[job_id]
+
+    def _event_handler(self, job: _Job, event: dict[str, Any]) -> bool:
         event_type = event.get("event", "")
+        job.profiler.record(event)
 
         if "stdout" in event:
             stdout = event["stdout"]
             if stdout:
-                streamer.queue_message(MessageType.STDOUT, stdout)
+                streamer.queue_message(MessageType.STDOUT, stdout, job.job_id)
 
         event_data = event.get("event_data", {})
-        if event_type == "runner_on_failed":
+        if event_type == "playbook_on_task_start":
+            job.started_tasks.append(event_data.get("task") or event_data.get("name", ""))
+        elif event_type == "runner_on_failed":
             task = event_data.get("task", "unknown")
-            streamer.queue_message(MessageType.EVENT, f"Task failed: {task}")
+            if not event_data.get("ignore_errors") and job.failed_task is None:
+                job.failed_task = task
+            streamer.queue_message(MessageType.EVENT, f"Task failed: {task}", job.job_id)
         elif event_type == "runner_on_ok":
             task = event_data.get("task", "unknown")
-            streamer.queue_message(MessageType.EVENT, f"Task OK: {task}")
+            streamer.queue_message(MessageType.EVENT, f"Task OK: {task}", job.job_id)
         elif event_type == "playbook_on_play_start":
             play = event_data.get("play", "unknown")
-            streamer.queue_message(MessageType.EVENT, f"Play started: {play}")
+            streamer.queue_message(MessageType.EVENT, f"Play started: {play}", job.job_id)
         elif event_type == "playbook_on_stats":
-            streamer.queue_message(MessageType.EVENT, "Playbook finished")
+            streamer.queue_message(MessageType.EVENT, "Playbook finished", job.job_id)
 
         return True
 
-    def _status_handler(self, status: dict[str, Any], runner_config: Any) -> bool:
+    def _status_handler(
+        self, job: _Job, status: dict[str, Any], runner_config: Any
+    ) -> bool:
         status_value = status.get("status", "")
 
         if status_value == "running":
-            self._status = JobStatus.RUNNING
-            streamer.queue_message(MessageType.STATUS, "running")
+            job.status = JobStatus.RUNNING
+            streamer.queue_message(MessageType.STATUS, "running", job.job_id)
         elif status_value == "successful":
-            self._status = JobStatus.COMPLETED
-            self._finished_at = datetime.utcnow()
-            self._return_code = 0
-            streamer.queue_message(MessageType.STATUS, "completed")
+            self._finish(job, JobStatus.COMPLETED, 0)
         elif status_value == "failed":
-            self._status = JobStatus.FAILED
-            self._finished_at = datetime.utcnow()
-            self._return_code = 1
-            streamer.queue_message(MessageType.STATUS, "failed")
+            self._finish(job, JobStatus.FAILED, 1)
 
         return True
 
-    async def run_playbook(
-        self, playbook: str, extra_vars: dict[str, Any]
-    ) -> UUID:
-        if self._status == JobStatus.RUNNING:
-            raise RuntimeError("A playbook is already running")
-
-        self._job_id = uuid4()
-        self._status = JobStatus.RUNNING
-        self._started_at = datetime.utcnow()
-        self._finished_at = None
-        self._return_code = None
+    def _finish(self, job: _Job, status: JobStatus, return_code: int) -> None:
+        with self._lock:
+            if job.finished_at is not None:
+                return
+            job.status = status
+            job.finished_at = datetime.utcnow()
+            job.return_code = return_code
+            self._prune_history()
+        streamer.queue_message(MessageType.STATUS, status.value, job.job_id)
 
-        streamer.set_job_id(self._job_id)
+        try:
+            profile_store.save(
+                settings.private_data_dir / "profiles",
+                job.playbook,
+                job.job_id,
+                job.profiler.snapshot(),
+                settings.profile_history,
+            )
+        except OSError:
+            pass
 
-        playbook_path = settings.playbook_dir / playbook
-        private_data_dir = settings.private_data_dir
+    def _stage_project(self, job: _Job, job_dir: Path) -> Path:
+        shared = settings.private_data_dir / "project"
+        with self._project_lock:
+            if self._project_users == 0:
+                job.content_hash = stager.stage(settings.playbook_dir, shared)
+                self._project_users += 1
+                return shared
+            content_hash = stager.current(settings.playbook_dir, shared)
+            if content_hash is not None:
+                job.content_hash = content_hash
+                self._project_users += 1
+                return shared
 
-        private_data_dir.mkdir(parents=True, exist_ok=True)
-        (private_data_dir / "project").mkdir(parents=True, exist_ok=True)
-        (private_data_dir / "inventory").mkdir(parents=True, exist_ok=True)
+        # The playbooks changed while another job runs from project/: stage a
+        # private copy instead of replacing files under the running job
+        job.content_hash = stager.stage(settings.playbook_dir, job_dir / "project")
+        return job_dir / "project"
 
-        inventory_path = private_data_dir / "inventory" / "hosts"
-        inventory_path.write_text("localhost ansible_connection=local\n")
+    def _run(self, job: _Job) -> None:
+        with self._lock:
+            job.status = JobStatus.RUNNING
+            job.started_at = job.started_at or datetime.utcnow()
+        streamer.set_job_id(job.job_id)
 
-        project_playbook = private_data_dir / "project" / playbook
-        if playbook_path.exists():
-            project_playbook.write_text(playbook_path.read_text())
-        else:
-            raise FileNotFoundError(f"Playbook not found: {playbook_path}")
+        # Every job gets its own private_data_dir (inventory, env); artifacts go
+        # to the shared artifacts/<job_id>, the project is shared when possible
+        job_dir = settings.private_data_dir / "jobs" / str(job.job_id)
+        project: Path | None = None
 
-        loop = asyncio.get_event_loop()
+        try:
+            project = self._stage_project(job, job_dir)
+            inventory_path = job_dir / "inventory" / "hosts"
+            inventory_path.parent.mkdir(parents=True, exist_ok=True)
+            inventory_path.write_text(INVENTORY)
 
-        def run_ansible():
             ansible_runner.run(
-                private_data_dir=str(private_data_dir),
-                playbook=playbook,
-                extravars=extra_vars,
-                event_handler=self._event_handler,
-                status_handler=self._status_handler,
+                private_data_dir=str(job_dir),
+                project_dir=str(project),
+                artifact_dir=str(artifact_store.artifact_dir),
+                playbook=job.playbook,
+                ident=str(job.job_id),
+                extravars=job.extra_vars,
+                event_handler=lambda event: self._event_handler(job, event),
+                status_handler=lambda status, config: self._status_handler(
+                    job, status, config
+                ),
                 quiet=True,
+                cmdline=(
+                    f"--start-at-task={shlex.quote(job.start_at_task)}"
+                    if job.start_at_task
+                    else None
+                ),
+                **profile_options(job.profile),
             )
+        except Exception as e:
+            # Otherwise the error would only end up in the unobserved Future
+            logger.exception("Job %s failed", job.job_id)
+            streamer.queue_message(MessageType.EVENT, f"Job failed: {e}", job.job_id)
+        finally:
+            # Runner errors before the first status callback leave the job open
+            self._finish(job, JobStatus.FAILED, 1)
+            if project == settings.private_data_dir / "project":
+                with self._project_lock:
+                    self._project_users -= 1
+            shutil.rmtree(job_dir, ignore_errors=True)
+            self._archive(job)
+
+    def _archive(self, job: _Job) -> None:
+        with self._lock:
+            active = {
+                j.job_id
+                for j in self._jobs.values()
+                if j.status in (JobStatus.QUEUED, JobStatus.RUNNING)
+            }
+        try:
+            artifact_store.archive(job.job_id)
+            artifact_store.apply_retention(active)
+        except OSError:
+            pass
+
+    async def run_playbook(
+        self,
+        playbook: str,
+        extra_vars: dict[str, Any],
+        profile: ExecutionProfile | None = None,
+    ) -> JobInfo:
+        playbook_path = settings.playbook_dir / playbook
+        if not playbook_path.exists():
+            raise FileNotFoundError(f"Playbook not found: {playbook_path}")
+
+        job = _Job(
+            playbook, extra_vars, profile or ExecutionProfile(settings.ansible_profile)
+        )
+        return self._submit(job)
+
+    async def resume_job(self, job_id: UUID, mode: ResumeMode) -> JobInfo | None:
+        """Re-run a failed job with the same variables, skipping finished tasks."""
+        with self._lock:
+            failed = self._jobs.get(job_id)
+        if failed is None:
+            return None
+        if failed.status != JobStatus.FAILED:
+            raise RuntimeError("Only failed jobs can be resumed")
 
-        loop.run_in_executor(None, run_ansible)
+        job = _Job(failed.playbook, failed.extra_vars, failed.profile)
+        job.resumed_from = failed.job_id
+        job.start_at_task = resume_point(
+            failed.started_tasks,
+            failed.failed_task,
+            find_checkpoints(settings.playbook_dir / failed.playbook),
+            mode,
+        )
+        return self._submit(job)
 
-        return self._job_id
+    def _submit(self, job: _Job) -> JobInfo:
+        with self._lock:
+            active = [
+                j
+                for j in self._jobs.values()
+                if j.status in (JobStatus.QUEUED, JobStatus.RUNNING)
+            ]
+            # A second start (double click, page reload) must not re-run the install
+            if any(j.playbook == job.playbook for j in active):
+                raise RuntimeError(f"Playbook {job.playbook} is already queued or running")
+            queued = sum(1 for j in active if j.status == JobStatus.QUEUED)
+            if queued >= settings.job_queue_size:
+                raise RuntimeError("Job queue is full")
+            if len(active) < settings.max_parallel_jobs:
+                # A worker is free, the executor starts the job right away
+                job.status = JobStatus.RUNNING
+                job.started_at = datetime.utcnow()
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.max_parallel_jobs,
+                    thread_name_prefix="ansible",
+                )
+            self._jobs[job.job_id] = job
+            job.future = self._executor.submit(self._run, job)
+            return job.info()
 
 
 runner_service = AnsibleRunnerService()
@@ -0,0 +1,269 @@
+import gzip
+import json
+import shutil
+import threading
+import time
+import zlib
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+from api.config import settings
+
+EVENT_STATUS = {
+    "runner_on_ok": "ok",
+    "runner_on_failed": "failed",
+    "runner_on_skipped": "skipped",
+    "runner_on_unreachable": "unreachable",
+}
+
+# Uncompressed size of one gzip member in events.gz. Every member can be
+# decompressed on its own, so a lookup only inflates a single block.
+BLOCK_SIZE = 64 * 1024
+
+
+def _event_counter(path: Path) -> int:
+    try:
+        return int(path.name.split("-", 1)[0])
+    except ValueError:
+        return 0
+
+
+def _index_entry(event: dict[str, Any]) -> dict[str, Any]:
+    event_data = event.get("event_data", {})
+    return {
+        "counter": event.get("counter"),
+        "event": event.get("event"),
+        "task": event_data.get("task"),
+        "host": event_data.get("host"),
+        "status": EVENT_STATUS.get(event.get("event", "")),
+    }
+
+
+def _matches(
+    entry: dict[str, Any], task: str | None, status: str | None, host: str | None
+) -> bool:
+    if task is not None and task.lower() not in (entry.get("task") or "").lower():
+        return False
+    if status is not None and entry.get("status") != status:
+        return False
+    if host is not None and entry.get("host") != host:
+        return False
+    return True
+
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+class ArtifactStore:
+    """Compresses finished ansible-runner artifacts and searches their events.
+
+    A finished job's artifacts/<job_id>/ directory is packed into
+    archive/<job_id>/:
+
+    - events.gz: job events as JSON lines, written as independent gzip
+      members of about BLOCK_SIZE bytes
+    - index.json.gz: per event counter, type, task, host, status and its block
+      and line; plus the byte offset of every block
+    - stdout.gz and status/rc files
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def artifact_dir(self) -> Path:
+        return settings.private_data_dir / "artifacts"
+
+    @property
+    def archive_dir(self) -> Path:
+        return settings.private_data_dir / "archive"
+
+    def archive(self, job_id: UUID) -> None:
+        source = self.artifact_dir / str(job_id)
+        if not source.is_dir():
+            return
+        target = self.archive_dir / str(job_id)
+        tmp = self.archive_dir / f".{job_id}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        entries: list[dict[str, Any]] = []
+        blocks: list[int] = []
+        block: list[bytes] = []
+        block_bytes = 0
+        offset = 0
+
+        with open(tmp / "events.gz", "wb") as out:
+
+            def flush() -> None:
+                nonlocal offset, block_bytes
+                if not block:
+                    return
+                data = gzip.compress(b"".join(block))
+                blocks.append(offset)
+                out.write(data)
+                offset += len(data)
+                block.clear()
+                block_bytes = 0
+
+            event_files = sorted(
+                (source / "job_events").glob("*.json"), key=_event_counter
+            )
+            for path in event_files:
+                try:
+                    event = json.loads(path.read_bytes())
+                except (OSError, ValueError):
+                    continue
+                line = json.dumps(event, separators=(",", ":")).encode() + b"\n"
+                entry = _index_entry(event)
+                entry["block"] = len(blocks)
+                entry["line"] = len(block)
+                entries.append(entry)
+                block.append(line)
+                block_bytes += len(line)
+                if block_bytes >= BLOCK_SIZE:
+                    flush()
+            flush()
+
+        with gzip.open(tmp / "index.json.gz", "wt") as f:
+            json.dump({"blocks": blocks, "events": entries}, f, separators=(",", ":"))
+        stdout = source / "stdout"
+        if stdout.exists():
+            with open(stdout, "rb") as src, gzip.open(tmp / "stdout.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+        for name in ("status", "rc"):
+            if (source / name).exists():
+                shutil.copy2(source / name, tmp / name)
+
+        with self._lock:
+            shutil.rmtree(target, ignore_errors=True)
+            tmp.rename(target)
+        shutil.rmtree(source, ignore_errors=True)
+
+    def apply_retention(self, active: set[UUID]) -> None:
+        """Drop archives beyond the configured count, age and total size.
+
+        Raw artifact directories of jobs that are no longer active (e.g. left
+        behind by a crash) are removed once they exceed the age limit.
+        """
+        now = time.time()
+        max_age = settings.artifact_max_age_days * 86400
+        active_names = {str(job_id) for job_id in active}
+
+        if self.artifact_dir.is_dir():
+            for path in self.artifact_dir.iterdir():
+                if path.name in active_names or not path.is_dir():
+                    continue
+                if now - path.stat().st_mtime > max_age:
+                    shutil.rmtree(path, ignore_errors=True)
+
+        if not self.archive_dir.is_dir():
+            return
+        with self._lock:
+            archives = sorted(
+                (
+                    p
+                    for p in self.archive_dir.iterdir()
+                    if p.is_dir() and not p.name.startswith(".")
+                ),
+                key=lambda p: p.stat().st_mtime,
+                reverse=True,
+            )
+            keep: list[Path] = []
+            total = 0
+            for path in archives:
+                size = _dir_size(path)
+                if (
+                    len(keep) >= settings.artifact_keep_jobs
+                    or now - path.stat().st_mtime > max_age
+                    or total + size > settings.artifact_max_bytes
+                ):
+                    shutil.rmtree(path, ignore_errors=True)
+                    continue
+                keep.append(path)
+                total += size
+
+    def _archived_events(
+        self, path: Path, task: str | None, status: str | None, host: str | None
+    ) -> Iterator[tuple[dict[str, Any], Any]]:
+        with gzip.open(path / "index.json.gz", "rt") as f:
+            index = json.load(f)
+        blocks = index["blocks"]
+        cached: tuple[int, list[bytes]] | None = None
+
+        with open(path / "events.gz", "rb") as f:
+            for entry in index["events"]:
+                if not _matches(entry, task, status, host):
+                    continue
+
+                def load(entry=entry) -> dict[str, Any]:
+                    nonlocal cached
+                    number = entry["block"]
+                    if cached is None or cached[0] != number:
+                        start = blocks[number]
+                        end = blocks[number + 1] if number + 1 < len(blocks) else None
+                        f.seek(start)
+                        raw = f.read() if end is None else f.read(end - start)
+                        data = zlib.decompress(raw, wbits=zlib.MAX_WBITS | 16)
+                        cached = (number, data.splitlines())
+                    return json.loads(cached[1][entry["line"]])
+
+                yield entry, load
+
+    def _raw_events(
+        self, path: Path, task: str | None, status: str | None, host: str | None
+    ) -> Iterator[tuple[dict[str, Any], Any]]:
+        for event_file in sorted((path / "job_events").glob("*.json"), key=_event_counter):
+            try:
+                event = json.loads(event_file.read_bytes())
+            except (OSError, ValueError):
+                continue
+            entry = _index_entry(event)
+            if _matches(entry, task, status, host):
+                yield entry, lambda event=event: event
+
+    def exists(self, job_id: UUID) -> bool:
+        return (self.archive_dir / str(job_id)).is_dir() or (
+            self.artifact_dir / str(job_id)
+        ).is_dir()
+
+    def search(
+        self,
+        job_id: UUID,
+        task: str | None = None,
+        status: str | None = None,
+        host: str | None = None,
+        query: str | None = None,
+        offset: int = 0,
+        limit: int = 100,
+    ) -> tuple[list[dict[str, Any]], int | None]:
+        """Events matching all filters: (page, next offset or None)."""
+        archived = self.archive_dir / str(job_id)
+        if archived.is_dir():
+            candidates = self._archived_events(archived, task, status, host)
+        else:
+            candidates = self._raw_events(self.artifact_dir / str(job_id), task, status, host)
+
+        needle = query.lower() if query else None
+        page: list[dict[str, Any]] = []
+        matched = 0
+        for _, load in candidates:
+            # Without a text query only events on the requested page are loaded
+            if needle is not None:
+                event = load()
+                if needle not in json.dumps(event).lower():
+                    continue
+            else:
+                event = None
+            if matched >= offset:
+                if len(page) == limit:
+                    return page, offset + limit
+                page.append(event if event is not None else load())
+            matched += 1
+        return page, None
+
+
+artifact_store = ArtifactStore()
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import yaml
+
+from api.models import ResumeMode
+
+CHECKPOINT_TAG = "checkpoint"
+TASK_SECTIONS = ("pre_tasks", "tasks", "post_tasks")
+BLOCK_SECTIONS = ("block", "rescue", "always")
+
+
+def _tags(task: dict) -> set[str]:
+    tags = task.get("tags") or []
+    if isinstance(tags, str):
+        tags = [t.strip() for t in tags.split(",")]
+    return set(map(str, tags))
+
+
+def _walk(tasks: list, inherited: set[str], names: list[str]) -> None:
+    for task in tasks or []:
+        if not isinstance(task, dict):
+            continue
+        tags = inherited | _tags(task)
+        if any(section in task for section in BLOCK_SECTIONS):
+            for section in BLOCK_SECTIONS:
+                _walk(task.get(section), tags, names)
+            continue
+        if CHECKPOINT_TAG in tags and task.get("name"):
+            names.append(task["name"])
+
+
+def find_checkpoints(playbook_path: Path) -> set[str]:
+    """Names of tasks tagged `checkpoint` in the plays of a playbook.
+
+    Tasks from roles and includes are not resolved.
+    """
+    try:
+        plays = yaml.safe_load(playbook_path.read_text()) or []
+    except (OSError, yaml.YAMLError):
+        return set()
+
+    names: list[str] = []
+    for play in plays if isinstance(plays, list) else []:
+        if not isinstance(play, dict):
+            continue
+        for section in TASK_SECTIONS:
+            _walk(play.get(section), _tags(play), names)
+    return set(names)
+
+
+def resume_point(
+    started_tasks: list[str],
+    failed_task: str | None,
+    checkpoints: set[str],
+    mode: ResumeMode,
+) -> str | None:
+    """Task to pass to --start-at-task, None to run the playbook from the start."""
+    if failed_task is None:
+        return None
+    if mode == ResumeMode.TASK:
+        return failed_task
+
+    # Latest checkpoint that was reached before (or is) the failed task
+    try:
+        end = len(started_tasks) - started_tasks[::-1].index(failed_task)
+    except ValueError:
+        end = len(started_tasks)
+    for name in reversed(started_tasks[:end]):
+        if name in checkpoints:
+            return name
+    return None
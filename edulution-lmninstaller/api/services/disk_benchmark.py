@@ -0,0 +1,110 @@
+import mmap
+import os
+import random
+import statistics
+import tempfile
+import time
+
+BLOCK_SIZE = 4096
+WRITE_CHUNK = 1024 * 1024
+# Written data is synced in steps of this size, so the final fsync after the
+# deadline only has to flush the last step
+WRITE_SYNC_EVERY = 16 * WRITE_CHUNK
+FSYNC_SAMPLES = 16
+
+
+def _open(path: str, flags: int) -> tuple[int, bool]:
+    # Direct I/O bypasses the page cache; tmpfs and some overlay filesystems
+    # reject it, in which case we fall back to buffered I/O
+    direct = getattr(os, "O_DIRECT", 0)
+    if direct:
+        try:
+            return os.open(path, flags | direct), True
+        except OSError:
+            pass
+    return os.open(path, flags), False
+
+
+def _sequential_write(path: str, size: int, deadline: float) -> float:
+    buf = mmap.mmap(-1, WRITE_CHUNK)
+    buf.write(os.urandom(WRITE_CHUNK))
+    fd, _ = _open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+    written = 0
+    try:
+        start = time.perf_counter()
+        unsynced = 0
+        while written < size and time.perf_counter() < deadline:
+            n = os.write(fd, buf)
+            written += n
+            unsynced += n
+            if unsynced >= WRITE_SYNC_EVERY:
+                os.fdatasync(fd)
+                unsynced = 0
+        os.fsync(fd)
+        elapsed = time.perf_counter() - start
+    finally:
+        os.close(fd)
+        buf.close()
+    return written / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+
+
+def _fsync_latency(path: str, deadline: float) -> float:
+    block = os.urandom(BLOCK_SIZE)
+    samples: list[float] = []
+    fd = os.open(path, os.O_WRONLY)
+    try:
+        for i in range(FSYNC_SAMPLES):
+            if samples and time.perf_counter() >= deadline:
+                break
+            os.pwrite(fd, block, i * BLOCK_SIZE)
+            start = time.perf_counter()
+            os.fsync(fd)
+            samples.append(time.perf_counter() - start)
+    finally:
+        os.close(fd)
+    return statistics.median(samples) * 1000
+
+
+def _random_read(path: str, size: int, deadline: float) -> float:
+    blocks = size // BLOCK_SIZE
+    buf = mmap.mmap(-1, BLOCK_SIZE)
+    fd, direct = _open(path, os.O_RDONLY)
+    ops = 0
+    try:
+        if not direct and hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        start = time.perf_counter()
+        while time.perf_counter() < deadline:
+            os.preadv(fd, [buf], random.randrange(blocks) * BLOCK_SIZE)
+            ops += 1
+        elapsed = time.perf_counter() - start
+    finally:
+        os.close(fd)
+        buf.close()
+    return ops / elapsed if elapsed > 0 else 0.0
+
+
+def run_benchmark(directory: str, size_mb: int, runtime: float) -> dict[str, float]:
+    """Measure write throughput, fsync latency and 4k random read IOPS.
+
+    Uses a scratch file in `directory`; `runtime` bounds the whole run and is
+    split across the three phases.
+    """
+    fd, path = tempfile.mkstemp(prefix=".edulution-bench-", dir=directory)
+    os.close(fd)
+    size = max(size_mb, 1) * 1024 * 1024
+    phase = runtime / 3
+    try:
+        write_mbps = _sequential_write(path, size, time.perf_counter() + phase)
+        fsync_ms = _fsync_latency(path, time.perf_counter() + phase)
+        # Only read the part of the file that was actually written
+        size = max(os.path.getsize(path), BLOCK_SIZE)
+        read_iops = _random_read(path, size, time.perf_counter() + phase)
+    finally:
+        os.unlink(path)
+
+    return {
+        "write_mbps": round(write_mbps, 1),
+        "fsync_ms": round(fsync_ms, 2),
+        "read_iops": round(read_iops),
+    }
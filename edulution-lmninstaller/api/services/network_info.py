@@ -0,0 +1,324 @@
+import ipaddress
+import socket
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable, TypeVar
+
+NET_DIR = Path("/sys/class/net")
+RESOLV_CONF = Path("/etc/resolv.conf")
+# systemd-resolved only lists its stub listener in /etc/resolv.conf
+RESOLVED_UPSTREAM_CONF = Path("/run/systemd/resolve/resolv.conf")
+
+# Fallback cache lifetime when netlink notifications are unavailable
+FALLBACK_TTL = 5.0
+
+RTF_UP = 0x0001
+RTF_GATEWAY = 0x0002
+RTF_REJECT = 0x0200
+
+NLMSG_HDR = struct.Struct("=IHHII")
+IFADDRMSG = struct.Struct("=BBBBI")
+RTATTR = struct.Struct("=HH")
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+RTM_NEWADDR = 20
+RTM_GETADDR = 22
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_IFADDR = 0x100
+RTMGRP_IPV6_ROUTE = 0x400
+
+T = TypeVar("T")
+
+
+def _align(length: int) -> int:
+    return (length + 3) & ~3
+
+
+def _read(path: Path) -> str | None:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def _gather(source: Callable[[], T], default: T) -> T:
+    # One unreadable or unexpected source must not hide the others
+    try:
+        return source()
+    except Exception:
+        return default
+
+
+def _netmask(prefixlen: int) -> str:
+    return str(ipaddress.IPv4Network(f"0.0.0.0/{prefixlen}").netmask)
+
+
+def _ipv4_routes() -> list[dict]:
+    routes = []
+    try:
+        lines = Path("/proc/net/route").read_text().splitlines()[1:]
+    except OSError:
+        return routes
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 8:
+            continue
+        flags = int(fields[3], 16)
+        if not flags & RTF_UP:
+            continue
+        mask = int(fields[7], 16)
+        routes.append(
+            {
+                "interface": fields[0],
+                # /proc/net/route stores addresses in host (little endian) order
+                "destination": socket.inet_ntoa(struct.pack("<I", int(fields[1], 16))),
+                "prefixlen": bin(mask).count("1"),
+                "gateway": (
+                    socket.inet_ntoa(struct.pack("<I", int(fields[2], 16)))
+                    if flags & RTF_GATEWAY
+                    else None
+                ),
+                "metric": int(fields[6]),
+            }
+        )
+    return routes
+
+
+def _ipv6_routes() -> list[dict]:
+    routes = []
+    try:
+        lines = Path("/proc/net/ipv6_route").read_text().splitlines()
+    except OSError:
+        return routes
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 10:
+            continue
+        flags = int(fields[8], 16)
+        if not flags & RTF_UP or flags & RTF_REJECT:
+            continue
+        gateway = ipaddress.IPv6Address(bytes.fromhex(fields[4]))
+        routes.append(
+            {
+                "interface": fields[9],
+                "destination": str(ipaddress.IPv6Address(bytes.fromhex(fields[0]))),
+                "prefixlen": int(fields[1], 16),
+                "gateway": str(gateway) if flags & RTF_GATEWAY and int(gateway) else None,
+                "metric": int(fields[5], 16),
+            }
+        )
+    return routes
+
+
+def _default_route(routes: list[dict]) -> dict | None:
+    defaults = [r for r in routes if r["prefixlen"] == 0 and r["gateway"]]
+    return min(defaults, key=lambda r: r["metric"], default=None)
+
+
+def _addresses() -> dict[int, list[tuple[int, str, int]]]:
+    """Dump all IPv4 and IPv6 addresses via an RTM_GETADDR netlink request."""
+    result: dict[int, list[tuple[int, str, int]]] = {}
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+    try:
+        sock.bind((0, 0))
+        payload = IFADDRMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+        header = NLMSG_HDR.pack(
+            NLMSG_HDR.size + len(payload), RTM_GETADDR, NLM_F_REQUEST | NLM_F_DUMP, 1, 0
+        )
+        sock.send(header + payload)
+
+        while True:
+            data = sock.recv(65536)
+            offset = 0
+            while offset + NLMSG_HDR.size <= len(data):
+                length, msg_type, _, _, _ = NLMSG_HDR.unpack_from(data, offset)
+                if msg_type in (NLMSG_DONE, NLMSG_ERROR) or length < NLMSG_HDR.size:
+                    return result
+                if msg_type == RTM_NEWADDR:
+                    family, prefixlen, _, _, index = IFADDRMSG.unpack_from(
+                        data, offset + NLMSG_HDR.size
+                    )
+                    attrs: dict[int, bytes] = {}
+                    attr = offset + NLMSG_HDR.size + IFADDRMSG.size
+                    while attr + RTATTR.size <= offset + length:
+                        attr_len, attr_type = RTATTR.unpack_from(data, attr)
+                        if attr_len < RTATTR.size:
+                            break
+                        attrs[attr_type] = data[attr + RTATTR.size : attr + attr_len]
+                        attr += _align(attr_len)
+                    # IFA_LOCAL is the interface address on point-to-point links
+                    raw = attrs.get(IFA_LOCAL) or attrs.get(IFA_ADDRESS)
+                    if raw is not None:
+                        address = socket.inet_ntop(family, raw)
+                        result.setdefault(index, []).append((family, address, prefixlen))
+                offset += _align(length)
+    finally:
+        sock.close()
+
+
+def _speed(name: str) -> int | None:
+    # Reading speed fails with EINVAL for links that are down or virtual
+    value = _read(NET_DIR / name / "speed")
+    try:
+        speed = int(value) if value is not None else None
+    except ValueError:
+        return None
+    return speed if speed and speed > 0 else None
+
+
+def _interfaces() -> list[dict]:
+    addresses = _gather(_addresses, {})
+
+    interfaces = []
+    for index, name in sorted(_gather(socket.if_nameindex, [])):
+        base = NET_DIR / name
+        mtu = _read(base / "mtu")
+        entries = addresses.get(index, [])
+        interfaces.append(
+            {
+                "name": name,
+                "mac": _read(base / "address"),
+                "mtu": int(mtu) if mtu and mtu.isdigit() else None,
+                "state": _read(base / "operstate"),
+                "speed_mbps": _speed(name),
+                "ipv4": [
+                    {"address": a, "prefixlen": p}
+                    for f, a, p in entries
+                    if f == socket.AF_INET
+                ],
+                "ipv6": [
+                    {"address": a, "prefixlen": p}
+                    for f, a, p in entries
+                    if f == socket.AF_INET6
+                ],
+            }
+        )
+    return interfaces
+
+
+def _nameservers(path: Path) -> list[str]:
+    text = _read(path) or ""
+    return [
+        line.split()[1]
+        for line in text.splitlines()
+        if line.startswith("nameserver") and len(line.split()) > 1
+    ]
+
+
+def _dns() -> list[str]:
+    servers = _nameservers(RESOLV_CONF)
+    if servers == ["127.0.0.53"]:
+        servers = _nameservers(RESOLVED_UPSTREAM_CONF) or servers
+    return servers
+
+
+def _mtime(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def collect_network_info() -> dict:
+    """Collect network facts; sources that fail are left empty, so the
+    hostname and everything else that could be read is still returned."""
+    routes = _gather(_ipv4_routes, [])
+    routes6 = _gather(_ipv6_routes, [])
+    interfaces = _gather(_interfaces, [])
+
+    result: dict = {
+        "hostname": _gather(socket.gethostname, None),
+        "interfaces": interfaces,
+        "routes": routes + routes6,
+        "dns": _gather(_dns, []),
+    }
+
+    default = _default_route(routes)
+    if default:
+        result["gateway"] = default["gateway"]
+        result["interface"] = default["interface"]
+        iface = next((i for i in interfaces if i["name"] == default["interface"]), None)
+        if iface and iface["ipv4"]:
+            result["ip"] = iface["ipv4"][0]["address"]
+            result["netmask"] = _netmask(iface["ipv4"][0]["prefixlen"])
+
+    default6 = _default_route(routes6)
+    if default6:
+        result["gateway6"] = default6["gateway"]
+
+    return result
+
+
+class NetworkInfoCache:
+    """Caches network facts until the kernel reports a link, address or route
+    change on a subscribed netlink socket, or /etc/resolv.conf changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._info: dict | None = None
+        self._collected_at = 0.0
+        self._resolv_mtime = 0
+        self._monitor: socket.socket | None = None
+        self._monitor_failed = False
+
+    def _open_monitor(self) -> None:
+        if self._monitor is not None or self._monitor_failed:
+            return
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+            sock.bind(
+                (
+                    0,
+                    RTMGRP_LINK
+                    | RTMGRP_IPV4_IFADDR
+                    | RTMGRP_IPV4_ROUTE
+                    | RTMGRP_IPV6_IFADDR
+                    | RTMGRP_IPV6_ROUTE,
+                )
+            )
+            sock.setblocking(False)
+            self._monitor = sock
+        except (OSError, AttributeError):
+            self._monitor_failed = True
+
+    def _changed(self) -> bool:
+        if self._monitor is None:
+            return time.monotonic() - self._collected_at > FALLBACK_TTL
+
+        changed = False
+        while True:
+            try:
+                self._monitor.recv(65536)
+                changed = True
+            except BlockingIOError:
+                return changed
+            except OSError:
+                # Receive buffer overflow (ENOBUFS): events were lost
+                return True
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._info = None
+
+    def get(self) -> dict:
+        with self._lock:
+            self._open_monitor()
+            changed = self._changed()
+            resolv_mtime = _mtime(RESOLV_CONF)
+            if self._info is None or changed or resolv_mtime != self._resolv_mtime:
+                self._info = collect_network_info()
+                self._collected_at = time.monotonic()
+                self._resolv_mtime = resolv_mtime
+            return self._info
+
+
+network_info = NetworkInfoCache()
@@ -1,61 +1,234 @@
 import asyncio
+import threading
+from collections import OrderedDict, deque
 from datetime import datetime
 from uuid import UUID
 
 from fastapi import WebSocket
 
-from api.models import MessageType, WebSocketMessage
+from api.config import settings
+from api.models import MessageType, SlowConsumerPolicy, StreamStats, WebSocketMessage
+from api.services.replay_buffer import ReplayBuffer
+
+
+class _Client:
+    __slots__ = ("websocket", "job_id", "queue", "task", "dropped")
+
+    def __init__(self, websocket: WebSocket, job_id: UUID | None, queue_size: int):
+        self.websocket = websocket
+        # None subscribes to the output of all jobs
+        self.job_id = job_id
+        self.queue: asyncio.Queue[str | tuple[str, ...]] = asyncio.Queue(maxsize=queue_size)
+        self.task: asyncio.Task | None = None
+        self.dropped = 0
 
 
 class OutputStreamer:
     def __init__(self):
-        self._connections: list[WebSocket] = []
-        self._queue: asyncio.Queue[WebSocketMessage] = asyncio.Queue()
+        self._clients: dict[WebSocket, _Client] = {}
+        self._pending: deque[tuple[MessageType, str, datetime, UUID | None]] = deque()
+        self._pending_lock = threading.Lock()
+        self._wakeup = asyncio.Event()
+        self._wakeup_scheduled = False
+        self._loop: asyncio.AbstractEventLoop | None = None
         self._current_job_id: UUID | None = None
+        self._policy = SlowConsumerPolicy(settings.ws_slow_consumer_policy)
+        self._dropped_total = 0
+        self._disconnected_slow = 0
+        self._buffers: OrderedDict[UUID | None, ReplayBuffer] = OrderedDict()
 
     def set_job_id(self, job_id: UUID) -> None:
         self._current_job_id = job_id
 
-    async def connect(self, websocket: WebSocket) -> None:
+    def _buffer_for(self, job_id: UUID | None) -> ReplayBuffer:
+        buffer = self._buffers.get(job_id)
+        if buffer is None:
+            buffer = ReplayBuffer(
+                job_id,
+                max_bytes=settings.ws_replay_max_bytes,
+                spill_dir=settings.ws_replay_spill_dir,
+            )
+            self._buffers[job_id] = buffer
+            while len(self._buffers) > settings.ws_replay_jobs:
+                _, old = self._buffers.popitem(last=False)
+                old.close()
+        return buffer
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        since: int | None = None,
+        job_id: UUID | None = None,
+    ) -> None:
         await websocket.accept()
-        self._connections.append(websocket)
+        client = _Client(websocket, job_id, settings.ws_send_queue_size)
+
+        # Snapshot the replay boundary and register the client without awaiting
+        # in between, so live messages continue exactly after the replayed ones
+        buffer = None
+        upto = 0
+        if since is not None:
+            buffer = self._buffers.get(job_id or self._current_job_id)
+            if buffer is not None:
+                upto = buffer.last_seq
+
+        client.task = asyncio.create_task(self._writer(client, buffer, since, upto))
+        self._clients[websocket] = client
 
     def disconnect(self, websocket: WebSocket) -> None:
-        if websocket in self._connections:
-            self._connections.remove(websocket)
+        client = self._clients.pop(websocket, None)
+        if client and client.task and client.task is not asyncio.current_task():
+            client.task.cancel()
 
-    async def broadcast(self, message: WebSocketMessage) -> None:
-        disconnected = []
-        for connection in self._connections:
-            try:
-                await connection.send_json(message.model_dump(mode="json"))
-            except Exception:
-                disconnected.append(connection)
-
-        for conn in disconnected:
-            self.disconnect(conn)
-
-    def queue_message(self, msg_type: MessageType, data: str) -> None:
-        message = WebSocketMessage(
-            type=msg_type,
-            data=data,
-            timestamp=datetime.utcnow(),
-            job_id=self._current_job_id,
-        )
+    async def _writer(
+        self,
+        client: _Client,
+        buffer: ReplayBuffer | None,
+        since: int | None,
+        upto: int,
+    ) -> None:
         try:
-            self._queue.put_nowait(message)
+            if buffer is not None and since is not None:
+                cursor = since
+                while cursor < upto:
+                    # Without a spill file the oldest messages are gone, mark the
+                    # gap; live output can evict more of them while we replay
+                    missed = min(buffer.first_seq - 1, upto) - cursor
+                    if missed > 0:
+                        gap = WebSocketMessage(
+                            type=MessageType.EVENT,
+                            data=f"{missed} messages skipped (no longer buffered)",
+                            job_id=buffer.job_id,
+                        )
+                        await client.websocket.send_text(gap.model_dump_json())
+                        cursor += missed
+                        continue
+                    payloads, cursor = await buffer.read_after(cursor, upto)
+                    if not payloads:
+                        break
+                    for payload in payloads:
+                        await client.websocket.send_text(payload)
+
+            while True:
+                item = await client.queue.get()
+                for payload in (item if isinstance(item, tuple) else (item,)):
+                    await client.websocket.send_text(payload)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            self.disconnect(client.websocket)
+
+    def _enqueue(self, client: _Client, payload: str) -> None:
+        try:
+            client.queue.put_nowait(payload)
+            return
         except asyncio.QueueFull:
             pass
 
+        if self._policy == SlowConsumerPolicy.DISCONNECT:
+            self._disconnected_slow += 1
+            self.disconnect(client.websocket)
+            asyncio.create_task(self._close_slow(client.websocket))
+            return
+
+        if self._policy == SlowConsumerPolicy.COALESCE:
+            # Replace the backlog with a single gap marker so the client catches up
+            skipped = 0
+            while not client.queue.empty():
+                item = client.queue.get_nowait()
+                skipped += len(item) if isinstance(item, tuple) else 1
+            client.dropped += skipped
+            self._dropped_total += skipped
+            gap = WebSocketMessage(
+                type=MessageType.EVENT,
+                data=f"{skipped} messages skipped (client too slow)",
+                job_id=client.job_id or self._current_job_id,
+            )
+            # One queue slot for both, so this also works with a queue size of 1
+            client.queue.put_nowait((gap.model_dump_json(), payload))
+            return
+
+        client.dropped += 1
+        self._dropped_total += 1
+
+    async def _close_slow(self, websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=1013, reason="Client too slow")
+        except Exception:
+            pass
+
+    async def broadcast(self, message: WebSocketMessage) -> None:
+        buffer = self._buffer_for(message.job_id)
+        message.seq = buffer.last_seq + 1
+        payload = message.model_dump_json()
+        buffer.append(payload)
+        for client in list(self._clients.values()):
+            if client.job_id is None or client.job_id == message.job_id:
+                self._enqueue(client, payload)
+
+    def queue_message(
+        self, msg_type: MessageType, data: str, job_id: UUID | None = None
+    ) -> None:
+        # Called from the ansible-runner executor threads: only a cheap tuple is
+        # buffered here, the loop is woken once per batch via call_soon_threadsafe
+        item = (msg_type, data, datetime.utcnow(), job_id or self._current_job_id)
+        with self._pending_lock:
+            self._pending.append(item)
+            if self._wakeup_scheduled or self._loop is None:
+                return
+            self._wakeup_scheduled = True
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _take_batch(self) -> list[tuple[MessageType, str, datetime, UUID | None]]:
+        with self._pending_lock:
+            count = min(len(self._pending), settings.ws_batch_max_messages)
+            batch = [self._pending.popleft() for _ in range(count)]
+            if self._pending:
+                self._wakeup.set()
+            else:
+                self._wakeup_scheduled = False
+        return batch
+
+    def _build_messages(
+        self, batch: list[tuple[MessageType, str, datetime, UUID | None]]
+    ) -> list[WebSocketMessage]:
+        # One message (and one seq) per runner event; only the handoff from
+        # the runner thread to the loop is batched
+        return [
+            WebSocketMessage(type=msg_type, data=data, timestamp=timestamp, job_id=job_id)
+            for msg_type, data, timestamp, job_id in batch
+        ]
+
     async def process_queue(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        with self._pending_lock:
+            if self._pending:
+                self._wakeup_scheduled = True
+                self._wakeup.set()
+
         while True:
             try:
-                message = await asyncio.wait_for(self._queue.get(), timeout=0.1)
-                await self.broadcast(message)
-            except asyncio.TimeoutError:
-                await asyncio.sleep(0.01)
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                if len(self._pending) < settings.ws_batch_max_messages:
+                    await asyncio.sleep(settings.ws_batch_latency)
+
+                for message in self._build_messages(self._take_batch()):
+                    await self.broadcast(message)
+                # Let the writer tasks run before fanning out the next batch
+                await asyncio.sleep(0)
             except asyncio.CancelledError:
                 break
 
+    def stats(self) -> StreamStats:
+        return StreamStats(
+            connections=len(self._clients),
+            policy=self._policy,
+            queue_size=settings.ws_send_queue_size,
+            dropped_total=self._dropped_total,
+            disconnected_slow=self._disconnected_slow,
+            pending=[c.queue.qsize() for c in self._clients.values()],
+        )
+
 
 streamer = OutputStreamer()
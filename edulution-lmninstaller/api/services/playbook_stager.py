@@ -0,0 +1,160 @@
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+# ioctl(dest_fd, FICLONE, src_fd) creates a copy-on-write clone (btrfs, xfs)
+FICLONE = 0x40049409
+MANIFEST_NAME = ".staged.json"
+
+
+def _clone(source: Path, target: Path) -> None:
+    """Reflink `source` to `target`, or copy it where reflinks are unsupported.
+
+    Never a hardlink: a shared inode would let in-place edits of either side
+    leak into the other.
+    """
+    tmp = target.with_name(f".{target.name}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        with open(source, "rb") as src, open(tmp, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        shutil.copystat(source, tmp)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        shutil.copy2(source, tmp)
+    tmp.replace(target)
+
+
+def _stat_key(path: Path) -> list[int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+
+class PlaybookStager:
+    """Stages the playbook tree into the runner's project/ directory.
+
+    File digests are cached by (inode, size, mtime), so an unchanged tree is
+    detected with one stat() per file; only changed files are synced. The
+    manifest also records (inode, size, mtime) of every staged file, so
+    staged files modified or removed behind our back are staged again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._digests: dict[Path, tuple[tuple[int, int, int], str]] = {}
+
+    def _digest(self, path: Path) -> str:
+        st = path.stat()
+        key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        cached = self._digests.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        self._digests[path] = (key, digest)
+        return digest
+
+    def manifest(self, root: Path) -> dict[str, str]:
+        files: dict[str, str] = {}
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            for name in sorted(filenames):
+                if name.startswith("."):
+                    continue
+                path = Path(dirpath) / name
+                files[path.relative_to(root).as_posix()] = self._digest(path)
+        return files
+
+    @staticmethod
+    def tree_hash(manifest: dict[str, str]) -> str:
+        sha = hashlib.sha256()
+        for rel, digest in sorted(manifest.items()):
+            sha.update(f"{rel}\0{digest}\n".encode())
+        return sha.hexdigest()
+
+    @staticmethod
+    def _staged(project: Path) -> dict:
+        try:
+            return json.loads((project / MANIFEST_NAME).read_text())
+        except (OSError, ValueError):
+            return {"hash": None, "files": {}, "stats": {}}
+
+    @staticmethod
+    def _is_current(
+        staged: dict, tree_hash: str, stats: dict[str, list[int] | None]
+    ) -> bool:
+        previous_stats: dict[str, list[int]] = staged.get("stats", {})
+        return staged.get("hash") == tree_hash and all(
+            stat is not None and previous_stats.get(rel) == stat
+            for rel, stat in stats.items()
+        )
+
+    def current(self, source: Path, project: Path) -> str | None:
+        """Return the tree hash if `project` already holds `source`, else None.
+
+        Never writes to `project`.
+        """
+        with self._lock:
+            manifest = self.manifest(source)
+            tree_hash = self.tree_hash(manifest)
+            stats = {rel: _stat_key(project / rel) for rel in manifest}
+            if self._is_current(self._staged(project), tree_hash, stats):
+                return tree_hash
+            return None
+
+    def stage(self, source: Path, project: Path) -> str:
+        """Sync `source` into `project` and return the tree hash."""
+        with self._lock:
+            manifest = self.manifest(source)
+            tree_hash = self.tree_hash(manifest)
+
+            manifest_path = project / MANIFEST_NAME
+            staged = self._staged(project)
+
+            previous: dict[str, str] = staged.get("files", {})
+            previous_stats: dict[str, list[int]] = staged.get("stats", {})
+            stats: dict[str, list[int] | None] = {
+                rel: _stat_key(project / rel) for rel in manifest
+            }
+            if self._is_current(staged, tree_hash, stats):
+                return tree_hash
+
+            for rel, digest in manifest.items():
+                target = project / rel
+                if (
+                    previous.get(rel) == digest
+                    and stats[rel] is not None
+                    and previous_stats.get(rel) == stats[rel]
+                ):
+                    continue
+                target.parent.mkdir(parents=True, exist_ok=True)
+                _clone(source / rel, target)
+                stats[rel] = _stat_key(target)
+
+            for rel in previous.keys() - manifest.keys():
+                stale = project / rel
+                stale.unlink(missing_ok=True)
+                for parent in stale.parents:
+                    if parent == project or any(parent.iterdir()):
+                        break
+                    parent.rmdir()
+
+            project.mkdir(parents=True, exist_ok=True)
+            manifest_path.write_text(
+                json.dumps({"hash": tree_hash, "files": manifest, "stats": stats})
+            )
+            return tree_hash
+
+
+stager = PlaybookStager()
@@ -0,0 +1,99 @@
+import asyncio
+from array import array
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from uuid import UUID
+
+
+class ReplayBuffer:
+    def __init__(
+        self, job_id: UUID | None, max_bytes: int, spill_dir: Path | None = None
+    ):
+        self.job_id = job_id
+        # (seq, payload, encoded size)
+        self._entries: deque[tuple[int, str, int]] = deque()
+        self._bytes = 0
+        self._max_bytes = max_bytes
+        self._next_seq = 1
+        self._first_seq = 1
+
+        self._spill_path: Path | None = None
+        self._spill_file = None
+        self._spill_offsets = array("q")
+        self._spill_size = 0
+        if spill_dir is not None:
+            spill_dir.mkdir(parents=True, exist_ok=True)
+            self._spill_path = spill_dir / f"{job_id or 'no-job'}.jsonl"
+
+    @property
+    def last_seq(self) -> int:
+        return self._next_seq - 1
+
+    @property
+    def first_seq(self) -> int:
+        return self._first_seq
+
+    def append(self, payload: str) -> int:
+        seq = self._next_seq
+        self._next_seq += 1
+        size = len(payload.encode("utf-8"))
+        self._entries.append((seq, payload, size))
+        self._bytes += size
+
+        while self._bytes > self._max_bytes and len(self._entries) > 1:
+            old_seq, old_payload, old_size = self._entries.popleft()
+            self._bytes -= old_size
+            if self._spill_path is not None:
+                self._spill(old_payload)
+            else:
+                self._first_seq = old_seq + 1
+
+        return seq
+
+    def _spill(self, payload: str) -> None:
+        if self._spill_file is None:
+            self._spill_file = open(self._spill_path, "wb")
+        data = payload.encode("utf-8") + b"\n"
+        self._spill_offsets.append(self._spill_size)
+        self._spill_file.write(data)
+        self._spill_size += len(data)
+
+    def _read_spilled(self, start_index: int, count: int) -> list[str]:
+        with open(self._spill_path, "rb") as f:
+            f.seek(self._spill_offsets[start_index])
+            return [f.readline().decode("utf-8").rstrip("\n") for _ in range(count)]
+
+    async def read_after(
+        self, since: int, upto: int, limit: int = 500
+    ) -> tuple[list[str], int]:
+        since = max(since, self._first_seq - 1)
+        if since >= upto:
+            return [], since
+
+        spilled = len(self._spill_offsets)
+        start_index = since + 1 - self._first_seq
+        if start_index < spilled:
+            if self._spill_file is None or self._spill_file.closed:
+                # Buffer closed (job evicted) while a client was replaying
+                return [], since
+            count = min(limit, spilled - start_index, upto - since)
+            self._spill_file.flush()
+            payloads = await asyncio.to_thread(self._read_spilled, start_index, count)
+            return payloads, since + count
+
+        if not self._entries:
+            return [], since
+        offset = since + 1 - self._entries[0][0]
+        count = min(limit, upto - since)
+        payloads = [
+            payload for _, payload, _ in islice(self._entries, offset, offset + count)
+        ]
+        return payloads, since + len(payloads)
+
+    def close(self) -> None:
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+        if self._spill_path is not None:
+            self._spill_path.unlink(missing_ok=True)
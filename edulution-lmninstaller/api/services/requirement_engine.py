@@ -0,0 +1,448 @@
+import os
+import platform
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Hashable
+
+from api.config import settings
+from api.models import CheckStatus, RequirementCheck
+from api.services.disk_benchmark import run_benchmark
+
+FactKey = tuple[str, Hashable]
+
+_FACTS: dict[str, Callable[[Any], Any]] = {}
+# name -> (compare, symbol, wording of the required value in messages)
+_COMPARATORS: dict[str, tuple[Callable[[Any, Any], bool], str, str | None]] = {}
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="facts")
+
+
+def fact(name: str) -> Callable:
+    def register(collector: Callable[[Any], Any]) -> Callable:
+        _FACTS[name] = collector
+        return collector
+
+    return register
+
+
+def comparator(name: str, symbol: str, wording: str | None = None) -> Callable:
+    def register(compare: Callable[[Any, Any], bool]) -> Callable:
+        _COMPARATORS[name] = (compare, symbol, wording)
+        return compare
+
+    return register
+
+
+# --- Fact collectors ---------------------------------------------------------
+
+
+def _meminfo_gb(field: str) -> float | None:
+    try:
+        for line in Path("/proc/meminfo").read_text().splitlines():
+            if line.startswith(f"{field}:"):
+                return round(int(line.split()[1]) / 1024 / 1024, 1)
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _os_release() -> dict[str, str]:
+    try:
+        return platform.freedesktop_os_release()
+    except OSError:
+        return {}
+
+
+@fact("os.name")
+def _os_name(_: str | None) -> str | None:
+    return _os_release().get("NAME")
+
+
+@fact("os.version")
+def _os_version(_: str | None) -> str | None:
+    return _os_release().get("VERSION_ID")
+
+
+@fact("kernel.version")
+def _kernel_version(_: str | None) -> str:
+    return platform.release()
+
+
+@fact("ram_gb")
+def _ram_gb(_: str | None) -> float | None:
+    return _meminfo_gb("MemTotal")
+
+
+@fact("swap_gb")
+def _swap_gb(_: str | None) -> float | None:
+    return _meminfo_gb("SwapTotal")
+
+
+@fact("cpu.cores")
+def _cpu_cores(_: str | None) -> int | None:
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count()
+
+
+@fact("cpu.flags")
+def _cpu_flags(_: str | None) -> list[str] | None:
+    try:
+        for line in Path("/proc/cpuinfo").read_text().splitlines():
+            if line.startswith(("flags", "Features")):
+                return line.split(":", 1)[1].split()
+    except (OSError, IndexError):
+        pass
+    return None
+
+
+@fact("disks")
+def _disks(_: str | None) -> dict[str, float]:
+    disks: dict[str, float] = {}
+    block_dir = Path("/sys/block")
+    skip_prefixes = ("loop", "ram", "zram", "dm-", "sr", "fd")
+
+    if not block_dir.exists():
+        return disks
+
+    for device in sorted(block_dir.iterdir()):
+        if device.name.startswith(skip_prefixes):
+            continue
+        size_file = device / "size"
+        if not size_file.exists():
+            continue
+        try:
+            sectors = int(size_file.read_text().strip())
+            size_gb = round(sectors * 512 / (1024**3), 1)
+            if size_gb > 0:
+                disks[device.name] = size_gb
+        except (OSError, ValueError):
+            continue
+
+    return disks
+
+
+@fact("mount.free_gb")
+def _mount_free_gb(path: str | None) -> float | None:
+    try:
+        st = os.statvfs(path or "/")
+    except OSError:
+        return None
+    return round(st.f_bavail * st.f_frsize / (1024**3), 1)
+
+
+@fact("mount.free_inodes_percent")
+def _mount_free_inodes(path: str | None) -> float | None:
+    try:
+        st = os.statvfs(path or "/")
+    except OSError:
+        return None
+    if st.f_files == 0:
+        # Filesystems with dynamic inodes (e.g. btrfs) report no limit
+        return 100.0
+    return round(st.f_favail / st.f_files * 100, 1)
+
+
+# Disk benchmark: the three metrics come from one run per path, which is
+# reused for benchmark_ttl seconds because it is expensive
+_benchmark_lock = threading.Lock()
+_benchmarks: dict[str, tuple[float, dict[str, float]]] = {}
+
+
+def _benchmark(path: str | None) -> dict[str, float]:
+    path = path or "/"
+    with _benchmark_lock:
+        cached = _benchmarks.get(path)
+        if cached is not None and time.monotonic() - cached[0] < settings.benchmark_ttl:
+            return cached[1]
+        result = run_benchmark(path, settings.benchmark_size_mb, settings.benchmark_runtime)
+        _benchmarks[path] = (time.monotonic(), result)
+        return result
+
+
+def clear_benchmarks() -> None:
+    with _benchmark_lock:
+        _benchmarks.clear()
+
+
+@fact("disk.write_mbps")
+def _disk_write_mbps(path: str | None) -> float:
+    return _benchmark(path)["write_mbps"]
+
+
+@fact("disk.fsync_ms")
+def _disk_fsync_ms(path: str | None) -> float:
+    return _benchmark(path)["fsync_ms"]
+
+
+@fact("disk.read_iops")
+def _disk_read_iops(path: str | None) -> float:
+    return _benchmark(path)["read_iops"]
+
+
+# --- Comparators -------------------------------------------------------------
+
+
+def _version_tuple(value: Any) -> tuple[int, ...]:
+    match = re.match(r"\d+(\.\d+)*", str(value))
+    if not match:
+        raise ValueError(f"Not a version: {value}")
+    return tuple(int(part) for part in match.group(0).split("."))
+
+
+@comparator("min", ">=", "minimum")
+def _min(actual: Any, required: Any) -> bool:
+    return float(actual) >= float(required)
+
+
+@comparator("max", "<=", "maximum")
+def _max(actual: Any, required: Any) -> bool:
+    return float(actual) <= float(required)
+
+
+@comparator("equals", "==")
+def _equals(actual: Any, required: Any) -> bool:
+    return str(actual).lower() == str(required).lower()
+
+
+@comparator("min_version", ">=", "minimum")
+def _min_version(actual: Any, required: Any) -> bool:
+    return _version_tuple(actual) >= _version_tuple(required)
+
+
+@comparator("min_count", ">=", "minimum")
+def _min_count(actual: Any, required: Any) -> bool:
+    return len(actual) >= int(required)
+
+
+def _as_set(value: Any) -> set[str]:
+    return set(map(str, value if isinstance(value, list) else [value]))
+
+
+@comparator("includes", "includes")
+def _includes(actual: Any, required: Any) -> bool:
+    return _as_set(required) <= _as_set(actual)
+
+
+# --- Rules -------------------------------------------------------------------
+
+# Section keys of the requirements YAML:
+# (section, key) -> (check name, label, fact, comparator, unit, per item)
+SECTION_RULES: dict[tuple[str, str], tuple[str, str, str, str, str, bool]] = {
+    ("os", "distribution"): ("os_distribution", "OS distribution", "os.name", "equals", "", False),
+    ("os", "min_version"): ("os_version", "OS version", "os.version", "min_version", "", False),
+    ("kernel", "min_version"): ("kernel_version", "Kernel", "kernel.version", "min_version", "", False),
+    ("ram", "min_gb"): ("ram", "RAM", "ram_gb", "min", "GB", False),
+    ("swap", "min_gb"): ("swap", "Swap", "swap_gb", "min", "GB", False),
+    ("cpu", "min_cores"): ("cpu_cores", "CPU cores", "cpu.cores", "min", "", False),
+    ("cpu", "flags"): ("cpu_flags", "CPU flags", "cpu.flags", "includes", "", False),
+    ("disks", "min_count"): ("disk_count", "Disk count", "disks", "min_count", "", False),
+    ("disks", "min_size_gb"): ("disk_size", "Disk", "disks", "min", "GB", True),
+}
+
+# Checks whose message keeps the wording of the original system checks
+MESSAGES: dict[str, str] = {
+    "disk_count": "Found {actual} disk(s), minimum is {required}",
+    "disk_size": "{label} is {actual}, minimum is {required}",
+}
+
+# Per mountpoint keys below "mounts: {<path>: {...}}"
+MOUNT_RULES: dict[str, tuple[str, str, str, str]] = {
+    "min_free_gb": ("mount_free", "Free space", "mount.free_gb", "GB"),
+    "min_free_inodes_percent": ("mount_inodes", "Free inodes", "mount.free_inodes_percent", "%"),
+}
+
+# Opt-in keys below "benchmark: {path?: <dir>, ...}"
+BENCHMARK_RULES: dict[str, tuple[str, str, str, str, str]] = {
+    "min_write_mbps": ("disk_write", "Sequential write", "disk.write_mbps", "min", "MB/s"),
+    "max_fsync_ms": ("disk_fsync", "fsync latency", "disk.fsync_ms", "max", "ms"),
+    "min_read_iops": ("disk_read_iops", "Random 4k read", "disk.read_iops", "min", "IOPS"),
+}
+
+
+class RequirementSpecError(ValueError):
+    """An invalid requirements file; `entry` is the offending part of it."""
+
+    def __init__(self, message: str, entry: Any):
+        super().__init__(message)
+        self.entry = entry
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    label: str
+    fact: str
+    arg: Hashable
+    comparator: str
+    required: Any
+    unit: str = ""
+    per_item: bool = False
+
+    @property
+    def key(self) -> FactKey:
+        return (self.fact, self.arg)
+
+
+def _hashable(value: Any) -> Hashable:
+    # Fact args from free-form checks are memoized per (fact, arg)
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _hashable(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_hashable(v) for v in value)
+    return value
+
+
+def _mapping(value: Any, where: str) -> dict:
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise RequirementSpecError(f"{where} must be a mapping", value)
+    return value
+
+
+def compile_rules(spec: dict) -> list[Rule]:
+    rules: list[Rule] = []
+    spec = _mapping(spec, "Requirements")
+
+    for (section, key), (name, label, fact_name, cmp, unit, per_item) in SECTION_RULES.items():
+        value = _mapping(spec.get(section), section).get(key)
+        if value is not None:
+            rules.append(Rule(name, label, fact_name, None, cmp, value, unit, per_item))
+
+    for path, mount_spec in _mapping(spec.get("mounts"), "mounts").items():
+        for key, value in _mapping(mount_spec, f"mounts.{path}").items():
+            if key not in MOUNT_RULES:
+                raise RequirementSpecError(
+                    f"Unknown mount requirement: {key}", {path: mount_spec}
+                )
+            name, label, fact_name, unit = MOUNT_RULES[key]
+            rules.append(
+                Rule(f"{name}_{path}", f"{label} on {path}", fact_name, path, "min", value, unit)
+            )
+
+    benchmark = dict(_mapping(spec.get("benchmark"), "benchmark"))
+    bench_path = str(benchmark.pop("path", "/"))
+    for key, value in benchmark.items():
+        if key not in BENCHMARK_RULES:
+            raise RequirementSpecError(
+                f"Unknown benchmark requirement: {key}", {key: value}
+            )
+        name, label, fact_name, cmp, unit = BENCHMARK_RULES[key]
+        rules.append(
+            Rule(name, f"{label} on {bench_path}", fact_name, bench_path, cmp, value, unit)
+        )
+
+    # Free-form checks: {name, fact, arg?, unit?, <comparator>: value}
+    checks = spec.get("checks") or []
+    if not isinstance(checks, list):
+        raise RequirementSpecError("checks must be a list", checks)
+    for entry in checks:
+        if not isinstance(entry, dict):
+            raise RequirementSpecError("Invalid requirement check", entry)
+        cmp = next((c for c in _COMPARATORS if c in entry), None)
+        if cmp is None:
+            raise RequirementSpecError("Requirement check without comparator", entry)
+        if entry.get("fact") not in _FACTS:
+            raise RequirementSpecError(f"Unknown fact: {entry.get('fact')}", entry)
+        rules.append(
+            Rule(
+                entry.get("name", entry["fact"]),
+                entry.get("label", entry.get("name", entry["fact"])),
+                entry["fact"],
+                _hashable(entry.get("arg")),
+                cmp,
+                entry[cmp],
+                entry.get("unit", ""),
+            )
+        )
+
+    for rule in rules:
+        if rule.fact not in _FACTS:
+            raise RequirementSpecError(f"Unknown fact: {rule.fact}", rule.name)
+
+    return rules
+
+
+def collect_facts(keys: set[FactKey]) -> dict[FactKey, Any]:
+    futures = {key: _executor.submit(_FACTS[key[0]], key[1]) for key in keys}
+    facts: dict[FactKey, Any] = {}
+    for key, future in futures.items():
+        try:
+            facts[key] = future.result()
+        except Exception:
+            facts[key] = None
+    return facts
+
+
+def _format(value: Any, unit: str) -> str:
+    if isinstance(value, list):
+        value = ", ".join(map(str, value))
+    return f"{value} {unit}".strip()
+
+
+def _evaluate_one(
+    name: str, label: str, rule: Rule, actual: Any
+) -> RequirementCheck:
+    compare, symbol, wording = _COMPARATORS[rule.comparator]
+    required = f"{symbol} {_format(rule.required, rule.unit)}"
+    if rule.comparator == "equals":
+        required = str(rule.required)
+
+    if actual is None:
+        return RequirementCheck(
+            name=name,
+            status=CheckStatus.FAILED,
+            required=required,
+            actual="unknown",
+            message=f"Could not determine {label}",
+        )
+
+    try:
+        passed = compare(actual, rule.required)
+    except (TypeError, ValueError):
+        passed = False
+
+    actual_str = str(len(actual)) if rule.comparator == "min_count" else _format(actual, rule.unit)
+    if rule.comparator == "includes":
+        missing = sorted(_as_set(rule.required) - _as_set(actual))
+        actual_str = "all present" if not missing else f"missing {', '.join(missing)}"
+
+    verdict = "meets" if passed else "does not meet"
+    if rule.name in MESSAGES:
+        message = MESSAGES[rule.name].format(
+            label=label, actual=actual_str, required=_format(rule.required, rule.unit)
+        )
+    elif rule.comparator == "equals":
+        message = f"{label} is {actual_str}" if passed else f"Expected {required}, found {actual_str}"
+    elif wording is None:
+        message = f"{label}: {actual_str}"
+    else:
+        message = f"{label} {actual_str} {verdict} {wording} {_format(rule.required, rule.unit)}"
+
+    return RequirementCheck(
+        name=name,
+        status=CheckStatus.PASSED if passed else CheckStatus.FAILED,
+        required=required,
+        actual=actual_str,
+        message=message,
+    )
+
+
+def evaluate(rules: list[Rule], facts: dict[FactKey, Any]) -> list[RequirementCheck]:
+    checks: list[RequirementCheck] = []
+    for rule in rules:
+        actual = facts.get(rule.key)
+        if rule.per_item:
+            for item, value in (actual or {}).items():
+                checks.append(
+                    _evaluate_one(f"{rule.name}_{item}", f"{rule.label} {item}", rule, value)
+                )
+            continue
+        checks.append(_evaluate_one(rule.name, rule.label, rule, actual))
+    return checks
@@ -1,5 +1,5 @@
-import platform
-from pathlib import Path
+import threading
+import time
 
 import yaml
 
@@ -11,197 +11,99 @@ from api.models import (
     RequirementsResponse,
     SystemInfo,
 )
+from api.services.requirement_engine import (
+    FactKey,
+    RequirementSpecError,
+    Rule,
+    clear_benchmarks,
+    collect_facts,
+    compile_rules,
+    evaluate,
+)
 
+SYSTEM_INFO_FACTS: set[FactKey] = {
+    ("os.name", None),
+    ("os.version", None),
+    ("kernel.version", None),
+    ("ram_gb", None),
+    ("swap_gb", None),
+    ("cpu.cores", None),
+    ("disks", None),
+}
 
-class SystemChecker:
-    def _get_os_info(self) -> tuple[str | None, str | None]:
-        try:
-            info = platform.freedesktop_os_release()
-            return info.get("NAME"), info.get("VERSION_ID")
-        except OSError:
-            return None, None
 
-    def _get_ram_gb(self) -> float | None:
-        try:
-            meminfo = Path("/proc/meminfo").read_text()
-            for line in meminfo.splitlines():
-                if line.startswith("MemTotal:"):
-                    kb = int(line.split()[1])
-                    return round(kb / 1024 / 1024, 1)
-        except (OSError, ValueError, IndexError):
-            pass
-        return None
-
-    def _get_disks(self) -> list[DiskInfo]:
-        disks: list[DiskInfo] = []
-        block_dir = Path("/sys/block")
-        skip_prefixes = ("loop", "ram", "zram", "dm-", "sr", "fd")
-
-        if not block_dir.exists():
-            return disks
-
-        for device in sorted(block_dir.iterdir()):
-            if device.name.startswith(skip_prefixes):
-                continue
-            size_file = device / "size"
-            if not size_file.exists():
-                continue
-            try:
-                sectors = int(size_file.read_text().strip())
-                size_gb = round(sectors * 512 / (1024**3), 1)
-                if size_gb > 0:
-                    disks.append(DiskInfo(name=device.name, size_gb=size_gb))
-            except (OSError, ValueError):
-                continue
-
-        return disks
-
-    def get_system_info(self) -> SystemInfo:
-        os_name, os_version = self._get_os_info()
+class SystemChecker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._facts: dict[FactKey, tuple[float, object]] = {}
+        self._requirements: dict[str, tuple[int, list[Rule] | None]] = {}
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._facts.clear()
+            self._requirements.clear()
+        clear_benchmarks()
+
+    def _get_facts(self, keys: set[FactKey]) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            cached = {
+                key: value
+                for key, (collected_at, value) in self._facts.items()
+                if key in keys and now - collected_at < settings.facts_ttl
+            }
+
+        missing = keys - cached.keys()
+        if missing:
+            collected = collect_facts(missing)
+            with self._lock:
+                for key, value in collected.items():
+                    self._facts[key] = (now, value)
+            cached.update(collected)
+        return cached
+
+    def _system_info(self, facts: dict) -> SystemInfo:
         return SystemInfo(
-            os=os_name,
-            os_version=os_version,
-            ram_gb=self._get_ram_gb(),
-            disks=self._get_disks(),
+            os=facts.get(("os.name", None)),
+            os_version=facts.get(("os.version", None)),
+            kernel=facts.get(("kernel.version", None)),
+            ram_gb=facts.get(("ram_gb", None)),
+            swap_gb=facts.get(("swap_gb", None)),
+            cpu_cores=facts.get(("cpu.cores", None)),
+            disks=[
+                DiskInfo(name=name, size_gb=size_gb)
+                for name, size_gb in (facts.get(("disks", None)) or {}).items()
+            ],
         )
 
-    def _load_requirements(self, playbook: str) -> dict | None:
+    def get_system_info(self) -> SystemInfo:
+        return self._system_info(self._get_facts(SYSTEM_INFO_FACTS))
+
+    def _load_requirements(self, playbook: str) -> list[Rule] | None:
         req_file = settings.playbook_dir / "requirements" / playbook
-        if not req_file.exists():
+        try:
+            mtime = req_file.stat().st_mtime_ns
+        except OSError:
             return None
-        return yaml.safe_load(req_file.read_text())
-
-    def _check_os(
-        self, reqs: dict, system: SystemInfo
-    ) -> list[RequirementCheck]:
-        checks: list[RequirementCheck] = []
-        os_reqs = reqs.get("os")
-        if not os_reqs:
-            return checks
-
-        req_distro = os_reqs.get("distribution")
-        if req_distro:
-            actual = system.os or "unknown"
-            if actual.lower() == req_distro.lower():
-                checks.append(
-                    RequirementCheck(
-                        name="os_distribution",
-                        status=CheckStatus.PASSED,
-                        required=req_distro,
-                        actual=actual,
-                        message=f"OS distribution is {actual}",
-                    )
-                )
-            else:
-                checks.append(
-                    RequirementCheck(
-                        name="os_distribution",
-                        status=CheckStatus.FAILED,
-                        required=req_distro,
-                        actual=actual,
-                        message=f"Expected {req_distro}, found {actual}",
-                    )
-                )
-
-        req_version = os_reqs.get("min_version")
-        if req_version:
-            actual = system.os_version or "unknown"
-            req_parts = [int(x) for x in str(req_version).split(".")]
-            try:
-                actual_parts = [int(x) for x in actual.split(".")]
-                passed = actual_parts >= req_parts
-            except ValueError:
-                passed = False
-            checks.append(
-                RequirementCheck(
-                    name="os_version",
-                    status=CheckStatus.PASSED if passed else CheckStatus.FAILED,
-                    required=f">= {req_version}",
-                    actual=actual,
-                    message=f"OS version {actual} {'meets' if passed else 'does not meet'} minimum {req_version}",
-                )
-            )
 
-        return checks
-
-    def _check_ram(
-        self, reqs: dict, system: SystemInfo
-    ) -> list[RequirementCheck]:
-        checks: list[RequirementCheck] = []
-        ram_reqs = reqs.get("ram")
-        if not ram_reqs:
-            return checks
-
-        min_gb = ram_reqs.get("min_gb")
-        if min_gb is not None:
-            actual = system.ram_gb
-            if actual is None:
-                checks.append(
-                    RequirementCheck(
-                        name="ram",
-                        status=CheckStatus.FAILED,
-                        required=f">= {min_gb} GB",
-                        actual="unknown",
-                        message="Could not determine RAM size",
-                    )
-                )
-            else:
-                passed = actual >= min_gb
-                checks.append(
-                    RequirementCheck(
-                        name="ram",
-                        status=CheckStatus.PASSED if passed else CheckStatus.FAILED,
-                        required=f">= {min_gb} GB",
-                        actual=f"{actual} GB",
-                        message=f"RAM {actual} GB {'meets' if passed else 'does not meet'} minimum {min_gb} GB",
-                    )
-                )
-
-        return checks
-
-    def _check_disks(
-        self, reqs: dict, system: SystemInfo
-    ) -> list[RequirementCheck]:
-        checks: list[RequirementCheck] = []
-        disk_reqs = reqs.get("disks")
-        if not disk_reqs:
-            return checks
-
-        min_count = disk_reqs.get("min_count")
-        if min_count is not None:
-            actual_count = len(system.disks)
-            passed = actual_count >= min_count
-            checks.append(
-                RequirementCheck(
-                    name="disk_count",
-                    status=CheckStatus.PASSED if passed else CheckStatus.FAILED,
-                    required=f">= {min_count}",
-                    actual=str(actual_count),
-                    message=f"Found {actual_count} disk(s), minimum is {min_count}",
-                )
-            )
-
-        min_size_gb = disk_reqs.get("min_size_gb")
-        if min_size_gb is not None:
-            for disk in system.disks:
-                passed = disk.size_gb >= min_size_gb
-                checks.append(
-                    RequirementCheck(
-                        name=f"disk_size_{disk.name}",
-                        status=CheckStatus.PASSED if passed else CheckStatus.FAILED,
-                        required=f">= {min_size_gb} GB",
-                        actual=f"{disk.size_gb} GB",
-                        message=f"Disk {disk.name} is {disk.size_gb} GB, minimum is {min_size_gb} GB",
-                    )
-                )
+        with self._lock:
+            cached = self._requirements.get(playbook)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
 
-        return checks
+        try:
+            spec = yaml.safe_load(req_file.read_text())
+        except yaml.YAMLError as e:
+            raise RequirementSpecError(f"Invalid YAML: {e}", None)
+        rules = compile_rules(spec or {})
+        with self._lock:
+            self._requirements[playbook] = (mtime, rules)
+        return rules
 
     def check_requirements(self, playbook: str) -> RequirementsResponse:
-        system = self.get_system_info()
-        reqs = self._load_requirements(playbook)
+        rules = self._load_requirements(playbook)
 
-        if reqs is None:
+        if rules is None:
             return RequirementsResponse(
                 playbook=playbook,
                 all_passed=True,
@@ -212,21 +114,18 @@ class SystemChecker:
                         message=f"No requirements file found for {playbook}",
                     )
                 ],
-                system_info=system,
+                system_info=self.get_system_info(),
             )
 
-        checks: list[RequirementCheck] = []
-        checks.extend(self._check_os(reqs, system))
-        checks.extend(self._check_ram(reqs, system))
-        checks.extend(self._check_disks(reqs, system))
-
+        facts = self._get_facts(SYSTEM_INFO_FACTS | {rule.key for rule in rules})
+        checks = evaluate(rules, facts)
         all_passed = all(c.status != CheckStatus.FAILED for c in checks)
 
         return RequirementsResponse(
             playbook=playbook,
             all_passed=all_passed,
             checks=checks,
-            system_info=system,
+            system_info=self._system_info(facts),
         )
 
 
@@ -0,0 +1,233 @@
+import json
+import statistics
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+from api.models import JobProfile, PlayTiming, TaskTiming
+
+TASK_RESULT_EVENTS = {
+    "runner_on_ok": "ok",
+    "runner_on_failed": "failed",
+    "runner_on_skipped": "skipped",
+    "runner_on_unreachable": "unreachable",
+}
+
+
+def _parse_time(value: Any) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+class _TaskRecord:
+    __slots__ = ("name", "play", "status", "start", "end")
+
+    def __init__(self, name: str, play: str):
+        self.name = name
+        self.play = play
+        self.status = "ok"
+        self.start: datetime | None = None
+        self.end: datetime | None = None
+
+    @property
+    def duration(self) -> float:
+        if self.start is None or self.end is None:
+            return 0.0
+        return (self.end - self.start).total_seconds()
+
+
+class TaskProfiler:
+    """Collects task timings of one job from ansible-runner events.
+
+    A task that runs on several hosts spans from the earliest host start to
+    the latest host end.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tasks: dict[str, _TaskRecord] = {}
+
+    def record(self, event: dict[str, Any]) -> None:
+        status = TASK_RESULT_EVENTS.get(event.get("event", ""))
+        if status is None:
+            return
+
+        event_data = event.get("event_data", {})
+        start = _parse_time(event_data.get("start"))
+        end = _parse_time(event_data.get("end"))
+        if start is None or end is None:
+            return
+
+        name = event_data.get("task") or "unknown"
+        key = event_data.get("task_uuid") or name
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is None:
+                task = self._tasks[key] = _TaskRecord(name, event_data.get("play") or "")
+            task.start = start if task.start is None else min(task.start, start)
+            task.end = end if task.end is None else max(task.end, end)
+            if status != "ok":
+                task.status = status
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            return [
+                {
+                    "name": t.name,
+                    "play": t.play,
+                    "status": t.status,
+                    "start": t.start.isoformat() if t.start else None,
+                    "end": t.end.isoformat() if t.end else None,
+                    "duration": round(t.duration, 3),
+                }
+                for t in self._tasks.values()
+            ]
+
+
+class ProfileStore:
+    """Persists finished task profiles per playbook as JSON lines."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+
+    def _load(self, path: Path) -> list[dict]:
+        with self._lock:
+            try:
+                lines = path.read_text().splitlines()
+            except OSError:
+                return []
+        runs = []
+        for line in lines:
+            try:
+                runs.append(json.loads(line))
+            except ValueError:
+                continue
+        return runs
+
+    def load(
+        self, directory: Path, playbook: str, before: datetime | None = None
+    ) -> list[dict]:
+        """Persisted runs of `playbook`, only those finished before `before` if given."""
+        runs = self._load(directory / f"{playbook}.jsonl")
+        if before is None:
+            return runs
+        earlier = []
+        for run in runs:
+            finished_at = _parse_time(run.get("finished_at"))
+            if finished_at is not None and finished_at < before:
+                earlier.append(run)
+        return earlier
+
+    def find(self, directory: Path, job_id: UUID) -> tuple[str, dict, list[dict]] | None:
+        """Locate a persisted run: (playbook, run, runs before it)."""
+        for path in sorted(directory.glob("*.jsonl")):
+            runs = self._load(path)
+            for index, run in enumerate(runs):
+                if run.get("job_id") == str(job_id):
+                    return path.stem, run, runs[:index]
+        return None
+
+    def save(
+        self,
+        directory: Path,
+        playbook: str,
+        job_id: UUID,
+        tasks: list[dict],
+        keep: int,
+    ) -> None:
+        if not tasks:
+            return
+
+        run = {
+            "job_id": str(job_id),
+            "finished_at": datetime.utcnow().isoformat(),
+            "tasks": tasks,
+        }
+        path = directory / f"{playbook}.jsonl"
+        with self._lock:
+            runs = [r for r in self._load(path) if r.get("job_id") != str(job_id)]
+            runs = (runs + [run])[-keep:]
+            directory.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text("".join(json.dumps(r) + "\n" for r in runs))
+            tmp.replace(path)
+
+
+def _baseline(runs: list[dict]) -> tuple[dict[tuple[str, str], float], list[float]]:
+    """Median duration per (play, task) and total durations of earlier runs."""
+    durations: dict[tuple[str, str], list[float]] = {}
+    totals: list[float] = []
+    for run in runs:
+        tasks = run.get("tasks", [])
+        for task in tasks:
+            key = (task.get("play", ""), task.get("name", ""))
+            durations.setdefault(key, []).append(task.get("duration", 0.0))
+        totals.append(sum(t.get("duration", 0.0) for t in tasks))
+    return {k: statistics.median(v) for k, v in durations.items()}, totals
+
+
+def build_profile(
+    job_id: UUID,
+    playbook: str,
+    tasks: list[dict],
+    previous_runs: list[dict],
+    top: int,
+) -> JobProfile:
+    baseline, previous_totals = _baseline(previous_runs)
+
+    timings = []
+    plays: dict[str, list[dict]] = {}
+    for task in tasks:
+        previous = baseline.get((task["play"], task["name"]))
+        timings.append(
+            TaskTiming(
+                name=task["name"],
+                play=task["play"],
+                status=task["status"],
+                started_at=_parse_time(task["start"]),
+                finished_at=_parse_time(task["end"]),
+                duration=task["duration"],
+                previous_duration=previous,
+                delta=round(task["duration"] - previous, 3) if previous is not None else None,
+            )
+        )
+        plays.setdefault(task["play"], []).append(task)
+
+    play_timings = []
+    for name, play_tasks in plays.items():
+        starts = [s for s in (_parse_time(t["start"]) for t in play_tasks) if s]
+        ends = [e for e in (_parse_time(t["end"]) for t in play_tasks) if e]
+        play_timings.append(
+            PlayTiming(
+                name=name,
+                tasks=len(play_tasks),
+                duration=(
+                    round((max(ends) - min(starts)).total_seconds(), 3)
+                    if starts and ends
+                    else 0.0
+                ),
+            )
+        )
+
+    timings.sort(key=lambda t: t.duration, reverse=True)
+    total = round(sum(t["duration"] for t in tasks), 3)
+    return JobProfile(
+        job_id=job_id,
+        playbook=playbook,
+        total_duration=total,
+        previous_runs=len(previous_runs),
+        previous_total_duration=(
+            round(statistics.median(previous_totals), 3) if previous_totals else None
+        ),
+        tasks=timings[:top],
+        plays=play_timings,
+    )
+
+
+profile_store = ProfileStore()
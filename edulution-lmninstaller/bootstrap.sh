@@ -4,21 +4,34 @@ set -e
 # =============================================================================
 # Edulution LMN Installer - Bootstrap
 # =============================================================================
-# Downloads all files from GitHub, installs dependencies
-# and starts the API.
+# Downloads all files from GitHub (or a single bundle from the webinstaller),
+# installs dependencies and starts the API.
 #
 # Usage on the target server:
 #   curl -sSL https://raw.githubusercontent.com/edulution-io/edulution-installer/main/edulution-lmninstaller/bootstrap.sh | bash
+#
+# The webinstaller sets BUNDLE_URL and BUNDLE_SHA256 to its own bundle and
+# WHEELHOUSE_URL, WHEELHOUSE_SHA256 and WHEELHOUSE_KEY (the sha256 of the
+# requirements.txt it was built for) to its prebuilt wheels. If it pushed
+# them over SFTP, the URLs are file:// URLs on the target.
 # =============================================================================
 
 GITHUB_REPO="edulution-io/edulution-installer"
 GITHUB_BRANCH="${GITHUB_BRANCH:-main}"
 GITHUB_RAW="https://raw.githubusercontent.com/${GITHUB_REPO}/${GITHUB_BRANCH}/edulution-lmninstaller"
+BUNDLE_URL="${BUNDLE_URL:-}"
+BUNDLE_SHA256="${BUNDLE_SHA256:-}"
+WHEELHOUSE_URL="${WHEELHOUSE_URL:-}"
+WHEELHOUSE_SHA256="${WHEELHOUSE_SHA256:-}"
+WHEELHOUSE_KEY="${WHEELHOUSE_KEY:-}"
 
 INSTALL_DIR="/opt/edulution-installer"
 VENV_DIR="${INSTALL_DIR}/venv"
+REQUIREMENTS_STAMP="${VENV_DIR}/.requirements.sha256"
 API_HOST="0.0.0.0"
 API_PORT="8000"
+API_READY_ATTEMPTS=150
+API_READY_MARKER="EDULUTION_LMN_API_READY"
 
 RED='\033[0;31m'
 GREEN='\033[0;32m'
@@ -45,6 +58,12 @@ check_root() {
 }
 
 install_system_packages() {
+    if command -v ansible-playbook &> /dev/null && command -v curl &> /dev/null \
+        && python3 -c "import ensurepip, venv" &> /dev/null; then
+        log_info "System packages already installed"
+        return 0
+    fi
+
     log_info "Installing system packages..."
 
     if command -v apt-get &> /dev/null; then
@@ -102,8 +121,16 @@ download_api_files() {
         "api/routes/websocket.py"
         "api/services/__init__.py"
         "api/services/ansible_runner.py"
+        "api/services/artifact_store.py"
+        "api/services/checkpoints.py"
+        "api/services/disk_benchmark.py"
+        "api/services/network_info.py"
         "api/services/output_streamer.py"
+        "api/services/playbook_stager.py"
+        "api/services/replay_buffer.py"
+        "api/services/requirement_engine.py"
         "api/services/system_checker.py"
+        "api/services/task_profiler.py"
     )
 
     for file in "${files[@]}"; do
@@ -140,19 +167,96 @@ for item in data.get('tree', []):
     log_info "Playbooks downloaded"
 }
 
+install_bundle() {
+    if [[ -z "${BUNDLE_SHA256}" ]]; then
+        log_error "BUNDLE_SHA256 is required with BUNDLE_URL"
+        exit 1
+    fi
+
+    log_info "Downloading bundle from ${BUNDLE_URL}..."
+
+    local archive staging
+    archive=$(mktemp)
+    staging=$(mktemp -d)
+
+    # The webinstaller uses a self-signed certificate, the checksum below
+    # makes sure the archive is the one it announced
+    if ! curl -sSfLk "${BUNDLE_URL}" -o "${archive}"; then
+        log_error "Failed to download bundle: ${BUNDLE_URL}"
+        rm -rf "${archive}" "${staging}"
+        exit 1
+    fi
+    if ! echo "${BUNDLE_SHA256}  ${archive}" | sha256sum -c --status; then
+        log_error "Bundle checksum mismatch (expected ${BUNDLE_SHA256})"
+        rm -rf "${archive}" "${staging}"
+        exit 1
+    fi
+
+    tar -xzf "${archive}" -C "${staging}"
+
+    # Replace the sources as a whole, so modules removed upstream do not linger
+    rm -rf "${INSTALL_DIR}/api" "${INSTALL_DIR}/playbooks"
+    cp -a "${staging}/." "${INSTALL_DIR}/"
+    rm -rf "${archive}" "${staging}"
+
+    log_info "Bundle ${BUNDLE_SHA256:0:16} installed"
+}
+
+install_from_wheelhouse() {
+    local requirements_hash="$1"
+    local archive wheelhouse
+
+    if [[ -z "${WHEELHOUSE_URL}" || "${WHEELHOUSE_KEY}" != "${requirements_hash}" ]]; then
+        return 1
+    fi
+
+    log_info "Installing from wheelhouse ${WHEELHOUSE_KEY:0:16}..."
+    archive=$(mktemp)
+    wheelhouse=$(mktemp -d)
+
+    if curl -sSfLk "${WHEELHOUSE_URL}" -o "${archive}" \
+        && echo "${WHEELHOUSE_SHA256}  ${archive}" | sha256sum -c --status \
+        && tar -xf "${archive}" -C "${wheelhouse}" \
+        && pip install --no-index --find-links "${wheelhouse}" -r "${INSTALL_DIR}/requirements.txt" -q; then
+        rm -rf "${archive}" "${wheelhouse}"
+        return 0
+    fi
+
+    # E.g. wheels built for a different Python version than the target's
+    log_warn "Wheelhouse not usable, falling back to PyPI"
+    rm -rf "${archive}" "${wheelhouse}"
+    return 1
+}
+
 setup_virtual_environment() {
+    local requirements_hash
+    requirements_hash=$(sha256sum "${INSTALL_DIR}/requirements.txt" | cut -d' ' -f1)
+
+    if [[ -x "${VENV_DIR}/bin/uvicorn" && -f "${REQUIREMENTS_STAMP}" \
+        && "$(cat "${REQUIREMENTS_STAMP}")" == "${requirements_hash}" ]]; then
+        log_info "Virtual environment is up to date (requirements ${requirements_hash:0:16})"
+        return 0
+    fi
+
     log_info "Setting up Python virtual environment..."
 
-    python3 -m venv "${VENV_DIR}"
+    # The running API executes from this venv, stop it before the venv is wiped
+    stop_api_server
+
+    # Start from an empty venv, so packages dropped from requirements.txt do not linger
+    python3 -m venv --clear "${VENV_DIR}"
     source "${VENV_DIR}/bin/activate"
 
-    pip install --upgrade pip -q
-    pip install -r "${INSTALL_DIR}/requirements.txt" -q
+    if ! install_from_wheelhouse "${requirements_hash}"; then
+        pip install --upgrade pip -q
+        pip install -r "${INSTALL_DIR}/requirements.txt" -q
+    fi
 
+    echo "${requirements_hash}" > "${REQUIREMENTS_STAMP}"
     log_info "Virtual environment configured"
 }
 
-start_api_server() {
+stop_api_server() {
     # Alten Prozess stoppen falls vorhanden
     if [[ -f "${INSTALL_DIR}/api.pid" ]]; then
         local old_pid
@@ -160,9 +264,19 @@ start_api_server() {
         if kill -0 "${old_pid}" 2>/dev/null; then
             log_info "Stopping existing API server (PID: ${old_pid})..."
             kill "${old_pid}" 2>/dev/null || true
-            sleep 1
+            local attempt
+            for attempt in $(seq 1 50); do
+                kill -0 "${old_pid}" 2>/dev/null || break
+                sleep 0.2
+            done
+            kill -9 "${old_pid}" 2>/dev/null || true
         fi
+        rm -f "${INSTALL_DIR}/api.pid"
     fi
+}
+
+start_api_server() {
+    stop_api_server
 
     log_info "Starting API server on ${API_HOST}:${API_PORT}..."
 
@@ -183,17 +297,32 @@ start_api_server() {
     API_PID=$!
     echo "${API_PID}" > "${INSTALL_DIR}/api.pid"
 
-    sleep 2
+    wait_for_api
 
-    if kill -0 "${API_PID}" 2>/dev/null; then
-        log_info "API server started (PID: ${API_PID})"
-        log_info "API:       http://$(hostname -I | awk '{print $1}'):${API_PORT}"
-        log_info "Health:    http://$(hostname -I | awk '{print $1}'):${API_PORT}/api/health"
-        log_info "WebSocket: ws://$(hostname -I | awk '{print $1}'):${API_PORT}/ws/output"
-    else
-        log_error "Failed to start API server. Check ${INSTALL_DIR}/api.log"
-        exit 1
-    fi
+    log_info "API server started (PID: ${API_PID})"
+    log_info "API:       http://$(hostname -I | awk '{print $1}'):${API_PORT}"
+    log_info "Health:    http://$(hostname -I | awk '{print $1}'):${API_PORT}/api/health"
+    log_info "WebSocket: ws://$(hostname -I | awk '{print $1}'):${API_PORT}/ws/output"
+}
+
+wait_for_api() {
+    # Poll the local health endpoint and print the ready marker the
+    # webinstaller is waiting for as soon as the API answers
+    local attempt
+    for attempt in $(seq 1 "${API_READY_ATTEMPTS}"); do
+        if ! kill -0 "${API_PID}" 2>/dev/null; then
+            log_error "Failed to start API server. Check ${INSTALL_DIR}/api.log"
+            exit 1
+        fi
+        if curl -sf -o /dev/null --max-time 1 "http://127.0.0.1:${API_PORT}/api/health"; then
+            echo "${API_READY_MARKER}"
+            return 0
+        fi
+        sleep 0.2
+    done
+
+    log_error "API server did not become ready. Check ${INSTALL_DIR}/api.log"
+    exit 1
 }
 
 main() {
@@ -202,8 +331,12 @@ main() {
     check_root
     install_system_packages
     setup_directory_structure
-    download_api_files
-    download_playbooks
+    if [[ -n "${BUNDLE_URL}" ]]; then
+        install_bundle
+    else
+        download_api_files
+        download_playbooks
+    fi
     setup_virtual_environment
     start_api_server
 